@@ -0,0 +1 @@
+python3 -m benchmarks.run "$@"
\ No newline at end of file
@@ -0,0 +1,62 @@
+import tracemalloc
+
+from benchmarks import SRC_DIR  # noqa: F401 (puts src/ on sys.path)
+from htmlnode import LeafNode, ParentNode
+from textnode import TextNode, TextType
+
+NODE_COUNT = 100_000
+
+
+# The pre-__slots__ layouts, kept here so the benchmark can show both sides.
+class DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class DictHtmlNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+class DictLeafNode(DictHtmlNode):
+    def __init__(self, tag, value, props=None):
+        super().__init__(tag, value, None, props)
+
+
+class DictParentNode(DictHtmlNode):
+    def __init__(self, tag, children, props=None):
+        super().__init__(tag, None, children, props)
+
+
+CASES = [
+    ("TextNode", lambda: DictTextNode("text", TextType.NORMAL), lambda: TextNode("text", TextType.NORMAL)),
+    ("LeafNode", lambda: DictLeafNode("b", "text"), lambda: LeafNode("b", "text")),
+    ("ParentNode", lambda: DictParentNode("p", []), lambda: ParentNode("p", [])),
+]
+
+
+def bytes_per_node(factory, count=NODE_COUNT):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    nodes = [factory() for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # The list holding the nodes costs one pointer per node.
+    return (after - before) / len(nodes) - 8
+
+
+def main():
+    print(f"{'node':<12}{'dict bytes':>12}{'slots bytes':>13}{'saved':>8}")
+    for name, before, after in CASES:
+        old = bytes_per_node(before)
+        new = bytes_per_node(after)
+        print(f"{name:<12}{old:>12.0f}{new:>13.0f}{1 - new / old:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
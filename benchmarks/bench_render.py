@@ -0,0 +1,61 @@
+import timeit
+
+from benchmarks import SRC_DIR  # noqa: F401 (puts src/ on sys.path)
+from htmlnode import LeafNode, ParentNode
+
+
+# The recursive ParentNode.to_html this repo used before the explicit-stack
+# renderer, kept here as the comparison baseline.
+def recursive_to_html(node):
+    if not isinstance(node, ParentNode):
+        return node.to_html()
+    inner_html = "".join(recursive_to_html(child) for child in node.children)
+    props_html = node.props_to_html()
+    props_html = f" {props_html}" if props_html else ""
+    return f"<{node.tag}{props_html}>{inner_html}</{node.tag}>"
+
+
+def wide_tree(paragraphs=2000, spans=10):
+    children = []
+    for i in range(paragraphs):
+        leaves = [LeafNode("b" if j % 2 else None, f"text {i}.{j} ") for j in range(spans)]
+        leaves.append(LeafNode("a", "link", {"href": f"/page/{i}"}))
+        children.append(ParentNode("p", leaves))
+    return ParentNode("div", children)
+
+
+def deep_tree(depth):
+    node = LeafNode("span", "leaf")
+    for i in range(depth):
+        node = ParentNode("div", [LeafNode(None, str(i)), node], {"class": "level"})
+    return node
+
+
+def bench(name, tree, number):
+    recursive = timeit.timeit(lambda: recursive_to_html(tree), number=number) / number
+    iterative = timeit.timeit(tree.to_html, number=number) / number
+    print(f"{name:<22}{recursive * 1000:>14.2f}{iterative * 1000:>14.2f}{recursive / iterative:>9.2f}x")
+
+
+def main():
+    wide = wide_tree()
+    deep = deep_tree(300)
+    assert recursive_to_html(wide) == wide.to_html()
+    assert recursive_to_html(deep) == deep.to_html()
+
+    print(f"{'tree':<22}{'recursive ms':>14}{'iterative ms':>14}{'speedup':>10}")
+    bench("wide (2000 x 11)", wide, 20)
+    bench("deep (300 levels)", deep, 200)
+
+    very_deep = deep_tree(100_000)
+    seconds = timeit.timeit(very_deep.to_html, number=1)
+    try:
+        recursive_to_html(very_deep)
+        recursive_result = "ok"
+    except RecursionError:
+        recursive_result = "RecursionError"
+    print(f"deep (100000 levels): iterative {seconds * 1000:.2f} ms, recursive {recursive_result}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import os
+import random
+
+WORDS = (
+    "the ring bearer walked through rivendell and the misty mountains while elves sang of "
+    "valinor beyond the sea and dwarves delved deep into moria seeking mithril under stone"
+).split()
+
+# Relative weights of each block kind per profile.
+PROFILES = {
+    "mixed": {"paragraph": 6, "heading": 2, "ulist": 2, "olist": 1, "quote": 1, "code": 1},
+    "link-heavy": {"paragraph": 4, "heading": 1, "ulist": 4, "olist": 1, "quote": 0, "code": 0},
+    "code-heavy": {"paragraph": 3, "heading": 1, "ulist": 1, "olist": 0, "quote": 0, "code": 5},
+}
+
+# Chance that an inline span is a link (the rest are split between plain,
+# bold, italic, code and images).
+LINK_RATES = {"mixed": 0.1, "link-heavy": 0.5, "code-heavy": 0.05}
+
+TEMPLATE = """<!doctype html>
+<html>
+  <head>
+    <meta charset="utf-8" />
+    <title>{{ Title }}</title>
+    <link href="/index.css" rel="stylesheet" />
+  </head>
+  <body>
+    <article>{{ Content }}</article>
+  </body>
+</html>
+"""
+
+
+class CorpusGenerator:
+    def __init__(self, profile="mixed", seed=0, blocks_per_page=20):
+        if profile not in PROFILES:
+            raise ValueError(f"unknown profile {profile!r}, expected one of {sorted(PROFILES)}")
+        self.profile = profile
+        self.seed = seed
+        self.blocks_per_page = blocks_per_page
+        kinds = PROFILES[profile]
+        self.kinds = [kind for kind, weight in kinds.items() if weight]
+        self.weights = [kinds[kind] for kind in self.kinds]
+        self.link_rate = LINK_RATES[profile]
+
+    def __repr__(self):
+        return f"CorpusGenerator({self.profile}, seed={self.seed}, blocks_per_page={self.blocks_per_page})"
+
+    def page(self, index):
+        rng = random.Random(f"{self.seed}:{self.profile}:{index}")
+        blocks = [f"# Page {index}: {self.words(rng, 4)}"]
+        for kind in rng.choices(self.kinds, self.weights, k=self.blocks_per_page):
+            blocks.append(getattr(self, kind)(rng, index))
+        return "\n\n".join(blocks) + "\n"
+
+    def words(self, rng, count):
+        return " ".join(rng.choice(WORDS) for _ in range(count))
+
+    def inline(self, rng, index, spans):
+        parts = []
+        for _ in range(spans):
+            roll = rng.random()
+            if roll < self.link_rate:
+                parts.append(f"[{self.words(rng, 2)}](/section-{rng.randrange(50)}/page-{rng.randrange(index + 1)})")
+            elif roll < self.link_rate + 0.1:
+                parts.append(f"**{self.words(rng, 2)}**")
+            elif roll < self.link_rate + 0.2:
+                parts.append(f"_{self.words(rng, 2)}_")
+            elif roll < self.link_rate + 0.25:
+                parts.append(f"`{rng.choice(WORDS)}()`")
+            elif roll < self.link_rate + 0.27:
+                parts.append(f"![{self.words(rng, 2)}](/images/{rng.choice(WORDS)}.png)")
+            else:
+                parts.append(self.words(rng, rng.randint(3, 10)))
+        return " ".join(parts)
+
+    def paragraph(self, rng, index):
+        return "\n".join(self.inline(rng, index, rng.randint(3, 8)) for _ in range(rng.randint(1, 4)))
+
+    def heading(self, rng, index):
+        return "#" * rng.randint(2, 4) + " " + self.words(rng, rng.randint(2, 6))
+
+    def ulist(self, rng, index):
+        return "\n".join("- " + self.inline(rng, index, rng.randint(1, 3)) for _ in range(rng.randint(2, 8)))
+
+    def olist(self, rng, index):
+        return "\n".join(f"{i}. " + self.inline(rng, index, rng.randint(1, 3)) for i in range(1, rng.randint(3, 9)))
+
+    def quote(self, rng, index):
+        return "\n".join("> " + self.words(rng, rng.randint(4, 12)) for _ in range(rng.randint(1, 4)))
+
+    def code(self, rng, index):
+        lines = [f"    {rng.choice(WORDS)}_{i} = {rng.choice(WORDS)}({rng.randrange(100)})" for i in range(rng.randint(3, 15))]
+        return "\n".join(["```", f"def {rng.choice(WORDS)}():", *lines, "```"])
+
+    def page_path(self, index):
+        return os.path.join(f"section-{index % 50}", f"page-{index}", "index.md")
+
+
+def generate_site(root, pages, profile="mixed", seed=0, blocks_per_page=20):
+    generator = CorpusGenerator(profile, seed, blocks_per_page)
+    content_dir = os.path.join(root, "content")
+    static_dir = os.path.join(root, "static")
+    os.makedirs(static_dir, exist_ok=True)
+    with open(os.path.join(root, "template.html"), "w") as f:
+        f.write(TEMPLATE)
+    with open(os.path.join(static_dir, "index.css"), "w") as f:
+        f.write("body { font-family: serif; }\n")
+    total_bytes = 0
+    for index in range(pages):
+        path = os.path.join(content_dir, generator.page_path(index))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        text = generator.page(index)
+        total_bytes += len(text.encode())
+        with open(path, "w") as f:
+            f.write(text)
+    return total_bytes
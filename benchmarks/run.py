@@ -0,0 +1,110 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+
+from benchmarks.corpus import PROFILES, generate_site
+from benchmarks.stages import run_stages, time_full_build
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(prog="python3 -m benchmarks.run", description="Benchmark the site generator.")
+    parser.add_argument("--pages", type=int, default=1000, help="number of synthetic pages (default: 1000)")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="mixed")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--blocks", type=int, default=20, help="blocks per page")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per stage; the fastest is kept")
+    parser.add_argument("--jobs", type=int, default=1, help="--jobs passed to the full main.py build")
+    parser.add_argument("--skip-build", action="store_true", help="do not time the full main.py build")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="compare against a results file saved earlier")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10,
+        help="fail when a stage is slower than the baseline by more than this fraction (default: 0.10)",
+    )
+    parser.add_argument("--keep", metavar="DIR", help="generate the corpus in DIR and keep it")
+    return parser.parse_args(argv)
+
+
+def run(args):
+    site_root = args.keep or tempfile.mkdtemp(prefix="bench-site-")
+    try:
+        corpus_bytes = generate_site(site_root, args.pages, args.profile, args.seed, args.blocks)
+        stages = {}
+        for _ in range(max(1, args.repeat)):
+            for name, seconds in run_stages(site_root).items():
+                stages[name] = min(seconds, stages.get(name, seconds))
+        if not args.skip_build:
+            stages["full_build"] = min(time_full_build(site_root, args.jobs) for _ in range(max(1, args.repeat)))
+    finally:
+        if not args.keep:
+            shutil.rmtree(site_root)
+    return {
+        "meta": {
+            "pages": args.pages,
+            "profile": args.profile,
+            "seed": args.seed,
+            "blocks": args.blocks,
+            "jobs": args.jobs,
+            "corpus_bytes": corpus_bytes,
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+        },
+        "stages": stages,
+    }
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, seconds in results["stages"].items():
+        previous = baseline["stages"].get(name)
+        if not previous:
+            continue
+        change = seconds / previous - 1
+        if change > threshold:
+            regressions.append((name, previous, seconds, change))
+    return regressions
+
+
+def print_results(results, baseline=None):
+    meta = results["meta"]
+    print(f"{meta['pages']} pages, profile {meta['profile']}, {meta['corpus_bytes'] / 1e6:.1f} MB of markdown")
+    print(f"{'stage':<22}{'seconds':>10}{'baseline':>10}{'change':>9}")
+    for name, seconds in results["stages"].items():
+        previous = baseline["stages"].get(name) if baseline else None
+        if previous:
+            print(f"{name:<22}{seconds:>10.4f}{previous:>10.4f}{seconds / previous - 1:>+9.1%}")
+        else:
+            print(f"{name:<22}{seconds:>10.4f}")
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline["meta"]["pages"] != args.pages or baseline["meta"]["profile"] != args.profile:
+            print(f"warning: baseline was recorded with {baseline['meta']['pages']} pages, profile {baseline['meta']['profile']}")
+
+    results = run(args)
+    print_results(results, baseline)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if baseline:
+        regressions = compare(results, baseline, args.threshold)
+        for name, previous, seconds, change in regressions:
+            print(f"REGRESSION {name}: {previous:.4f}s -> {seconds:.4f}s ({change:+.1%}, threshold {args.threshold:.0%})")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import SRC_DIR
+from block_markdown import block_to_block_type, markdown_to_blocks, markdown_to_html_node
+from generate_page import extract_title, find_pages, write_page
+from inline_markdown import text_to_textnodes
+from template import load_template
+from urls import BasepathResolver
+
+STAGES = (
+    "read",
+    "markdown_to_blocks",
+    "block_to_block_type",
+    "text_to_textnodes",
+    "to_html",
+    "template",
+    "write",
+)
+
+INLINE_PREFIXES = ("- ", "> ")
+
+
+def run_stages(site_root, basepath="/"):
+    timings = dict.fromkeys(STAGES, 0.0)
+    resolver = BasepathResolver(basepath)
+    template = load_template(os.path.join(site_root, "template.html"), resolver)
+    out_dir = tempfile.mkdtemp(prefix="bench-out-")
+    try:
+        for from_path, dest_path in find_pages(os.path.join(site_root, "content"), out_dir):
+            start = time.perf_counter()
+            with open(from_path, "r") as f:
+                markdown = f.read()
+            timings["read"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            blocks = markdown_to_blocks(markdown)
+            timings["markdown_to_blocks"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            for block in blocks:
+                block_to_block_type(block)
+            timings["block_to_block_type"] += time.perf_counter() - start
+
+            texts = [inline_text(block) for block in blocks if not block.startswith("```")]
+            start = time.perf_counter()
+            for text in texts:
+                text_to_textnodes(text)
+            timings["text_to_textnodes"] += time.perf_counter() - start
+
+            node = markdown_to_html_node(markdown, resolver)
+            start = time.perf_counter()
+            html = node.to_html()
+            timings["to_html"] += time.perf_counter() - start
+
+            title = extract_title(markdown)
+            start = time.perf_counter()
+            page = template.render(Title=title, Content=html)
+            timings["template"] += time.perf_counter() - start
+
+            start = time.perf_counter()
+            write_page(dest_path, page)
+            timings["write"] += time.perf_counter() - start
+    finally:
+        shutil.rmtree(out_dir)
+    return timings
+
+
+def inline_text(block):
+    lines = block.split("\n")
+    return " ".join(line[2:] if line.startswith(INLINE_PREFIXES) else line for line in lines)
+
+
+def time_full_build(site_root, jobs=1, basepath="/"):
+    for generated in ("docs", ".build-manifest.json"):
+        path = os.path.join(site_root, generated)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        elif os.path.exists(path):
+            os.remove(path)
+    command = [sys.executable, os.path.join(SRC_DIR, "main.py"), basepath, "--jobs", str(jobs)]
+    start = time.perf_counter()
+    subprocess.run(command, cwd=site_root, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - start
@@ -0,0 +1,140 @@
+import asyncio
+import hashlib
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from block_cache import block_cache
+from generate_page import fill_template, find_pages, write_page
+from page import Page, compile_page
+from sharding import shard_pages
+from stats import counter_delta
+from template import TemplateLoader
+from urls import as_resolver
+
+DEFAULT_IO_WORKERS = 8
+DEFAULT_MAX_PENDING = 64
+
+
+def generate_pages_recursive_async(
+    dir_path_content, template_path, dest_dir_path, basepath, manifest=None, template_overrides=None,
+    stats=None, parse_cache=None, io_workers=DEFAULT_IO_WORKERS, max_pending=DEFAULT_MAX_PENDING, shard=None,
+    resolver=None,
+):
+    pages = shard_pages(find_pages(dir_path_content, dest_dir_path), dir_path_content, shard)
+    return generate_pages_async(
+        pages, dir_path_content, template_path, basepath, manifest, template_overrides, stats, parse_cache,
+        io_workers, max_pending, resolver,
+    )
+
+
+def generate_pages_async(
+    pages, dir_path_content, template_path, basepath, manifest=None, template_overrides=None,
+    stats=None, parse_cache=None, io_workers=DEFAULT_IO_WORKERS, max_pending=DEFAULT_MAX_PENDING, resolver=None,
+):
+    # Same results as generate_pages, but reads, freshness checks, cache
+    # lookups and writes go through a thread pool while the event loop
+    # thread parses and renders whatever has already been read. At most
+    # max_pending pages are in flight, which bounds memory on huge sites.
+    builder = AsyncPageBuilder(
+        dir_path_content, template_path, basepath, manifest, template_overrides, stats, parse_cache, resolver,
+    )
+    return asyncio.run(builder.run(pages, io_workers, max_pending))
+
+
+class AsyncPageBuilder:
+    def __init__(
+        self, dir_path_content, template_path, basepath, manifest, template_overrides, stats, parse_cache,
+        resolver=None,
+    ):
+        self.dir_path_content = dir_path_content
+        self.templates = TemplateLoader(
+            template_path, template_overrides, as_resolver(basepath if resolver is None else resolver)
+        )
+        self.basepath = basepath
+        self.manifest = manifest
+        self.stats = stats
+        self.parse_cache = parse_cache
+        self.errors = {}
+
+    async def run(self, pages, io_workers, max_pending):
+        self.loop = asyncio.get_running_loop()
+        self.executor = ThreadPoolExecutor(max_workers=max(1, io_workers))
+        cache_counters = block_cache.counters()
+        slots = asyncio.Semaphore(max(1, max_pending))
+        tasks = set()
+        try:
+            for page in pages:
+                await slots.acquire()
+                task = asyncio.create_task(self.build_page(*page))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+                task.add_done_callback(lambda _: slots.release())
+            if tasks:
+                await asyncio.gather(*tasks)
+        finally:
+            self.executor.shutdown()
+        if self.stats is not None:
+            self.stats.merge(counter_delta(block_cache.counters(), cache_counters))
+        return [(from_path, self.errors[from_path]) for from_path, _ in pages if from_path in self.errors]
+
+    def io(self, func, *args):
+        return self.loop.run_in_executor(self.executor, func, *args)
+
+    async def build_page(self, from_path, dest_path):
+        try:
+            await self._build_page(from_path, dest_path)
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            print(f"Error generating page {from_path}: {error}")
+            self.errors[from_path] = error
+
+    async def _build_page(self, from_path, dest_path):
+        rel_path = os.path.relpath(from_path, self.dir_path_content)
+        # Loading a template stats its files and may read them, so it runs
+        # on the pool like any other I/O.
+        template = await self.io(self.templates.for_page, rel_path)
+        resolver = self.templates.resolver_for(rel_path)
+        data = await self.io(read_bytes, from_path)
+        source_hash = hashlib.sha256(data).hexdigest()
+        if self.manifest is not None:
+            fresh = await self.io(
+                self.manifest.is_fresh, from_path, source_hash, template.digest, self.basepath, dest_path
+            )
+            if fresh:
+                print(f"Skipping unchanged page {from_path}")
+                self.add("pages_fresh")
+                return
+
+        entry = None
+        if self.parse_cache is not None:
+            cache_key = self.parse_cache.key(data, resolver)
+            entry = await self.io(self.parse_cache.get, cache_key)
+        if entry is not None:
+            page = Page.from_dict(from_path, entry)
+            self.add("parse_cache_hits")
+        else:
+            page = compile_page(io.TextIOWrapper(io.BytesIO(data)), from_path, resolver=resolver)
+            if self.parse_cache is not None:
+                page = page.rendered()
+                try:
+                    await self.io(self.parse_cache.put, cache_key, page.to_dict())
+                except OSError as e:
+                    print(f"Cannot write parse cache entry for {from_path}: {e}")
+                self.add("parse_cache_misses")
+
+        print(f"Generating page from {from_path} to {dest_path} using {self.templates.path_for(rel_path)}")
+        html = "".join(fill_template(template, page.title, page.content))
+        written, output_hash = await self.io(write_page, dest_path, html)
+        self.add("pages_written" if written else "pages_identical")
+        if self.manifest is not None:
+            self.manifest.record(from_path, source_hash, template.digest, self.basepath, dest_path, output_hash)
+
+    def add(self, name):
+        if self.stats is not None:
+            self.stats.add(name)
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
@@ -0,0 +1,156 @@
+import sys
+from collections import OrderedDict
+
+from block_markdown import block_to_html_node
+from htmlnode import LeafNode
+
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+
+
+HEADING_TAGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+
+
+class RenderedBlock(LeafNode):
+    # A block whose HTML has already been rendered. It renders as its raw
+    # value and carries the page metadata extracted from its node tree; the
+    # tree itself is not kept, so a cached block costs only its HTML.
+    __slots__ = ("metadata",)
+
+    def __init__(self, html, metadata):
+        super().__init__(None, html)
+        self.metadata = metadata
+
+    def __repr__(self):
+        return f"RenderedBlock({self.value!r})"
+
+
+class BlockMetadata:
+    __slots__ = ("headings", "links", "images", "word_count")
+
+    def __init__(self, headings, links, images, word_count):
+        self.headings = headings
+        self.links = links
+        self.images = images
+        self.word_count = word_count
+
+
+class BlockCache:
+    # Most blocks are unique to their page, so the cache is bounded by the
+    # memory its HTML strings take rather than by entry count. max_bytes
+    # of 0 disables it: blocks are then returned as node trees and only
+    # rendered when their page is written.
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return (
+            f"BlockCache({len(self.entries)} entries, {self.size}/{self.max_bytes} bytes, "
+            f"{self.hits} hits, {self.misses} misses)"
+        )
+
+    def render(self, block, resolver=None):
+        rendered = self.lookup(block, resolver)
+        if rendered is None:
+            rendered = self.store(block, block_to_html_node(block, resolver), resolver)
+        return rendered
+
+    def lookup(self, block, resolver=None):
+        if self.max_bytes <= 0:
+            self.misses += 1
+            return None
+        key = self.key(block, resolver)
+        rendered = self.entries.get(key)
+        if rendered is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return rendered
+
+    def store(self, block, node, resolver=None, metadata=None):
+        # Renders a freshly parsed block's HTML and caches it. render()
+        # does lookup and store in one call; profiled builds call them
+        # separately so parsing and rendering are timed as their own stages.
+        if self.max_bytes <= 0:
+            return node
+        if metadata is None:
+            metadata = walk_block(node)
+        rendered = RenderedBlock(node.to_html(), metadata)
+        size = sys.getsizeof(rendered.value)
+        if size <= self.max_bytes:
+            key = self.key(block, resolver)
+            previous = self.entries.pop(key, None)
+            if previous is not None:
+                self.size -= sys.getsizeof(previous.value)
+            self.entries[key] = rendered
+            self.size += size
+            self.evict()
+        return rendered
+
+    def resize(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.evict()
+
+    def evict(self):
+        while self.entries and self.size > max(self.max_bytes, 0):
+            _, rendered = self.entries.popitem(last=False)
+            self.size -= sys.getsizeof(rendered.value)
+
+    def key(self, block, resolver):
+        # The same block renders differently under different URL resolvers.
+        return block.text if resolver is None else (resolver.key, block.text)
+
+    def counters(self):
+        return {"block_cache_hits": self.hits, "block_cache_misses": self.misses}
+
+    def clear(self):
+        self.entries.clear()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+
+def walk_block(root):
+    headings = []
+    links = []
+    images = []
+    word_count = 0
+    level = HEADING_TAGS.get(root.tag)
+    if level is not None:
+        headings.append((level, text_content(root)))
+    if root.tag == "pre":
+        return BlockMetadata(headings, links, images, word_count)
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.children is not None:
+            stack.extend(reversed(node.children))
+        elif node.tag == "img":
+            images.append((node.props["src"], node.value))
+        else:
+            if node.tag == "a":
+                links.append(node.props["href"])
+            word_count += len(node.value.split())
+    return BlockMetadata(headings, links, images, word_count)
+
+
+def text_content(root):
+    parts = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.children is not None:
+            stack.extend(reversed(node.children))
+        elif node.tag != "img":
+            parts.append(node.value)
+    return "".join(parts)
+
+
+block_cache = BlockCache()
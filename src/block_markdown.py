@@ -1,5 +1,4 @@
 from enum import Enum
-import re
 
 from htmlnode import LeafNode, ParentNode
 from inline_markdown import text_to_textnodes
@@ -13,110 +12,172 @@ class BlockType(Enum):
     OLIST = "ordered_list"
     ULIST = "unordered_list"
 
-def markdown_to_blocks(markdown):
-    splitted = markdown.split("\n\n")
-    blocks = []
-    for s in splitted:
-        if s.strip() == "":
+HEADING_PREFIXES = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
+
+class Block:
+    __slots__ = ("block_type", "lines", "start_line", "end_line")
+
+    def __init__(self, block_type, lines, start_line, end_line):
+        self.block_type = block_type
+        self.lines = lines
+        self.start_line = start_line
+        self.end_line = end_line
+
+    def __eq__(self, other):
+        return (
+            self.block_type == other.block_type
+            and self.lines == other.lines
+            and self.start_line == other.start_line
+            and self.end_line == other.end_line
+        )
+
+    def __repr__(self):
+        return f"Block({self.block_type.name}, {self.lines}, {self.start_line}, {self.end_line})"
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+def iter_blocks(lines):
+    buffer = []
+    start_line = 1
+    for number, line in enumerate(lines, 1):
+        line = line.rstrip("\n")
+        if line == "":
+            if buffer:
+                block = make_block(buffer, start_line)
+                if block is not None:
+                    yield block
+                buffer = []
             continue
-        blocks.append(s.strip())
-    return blocks
+        if not buffer:
+            start_line = number
+        buffer.append(line)
+    if buffer:
+        block = make_block(buffer, start_line)
+        if block is not None:
+            yield block
+
+def make_block(lines, start_line):
+    first = 0
+    while first < len(lines) and lines[first].strip() == "":
+        first += 1
+    last = len(lines)
+    while last > first and lines[last - 1].strip() == "":
+        last -= 1
+    if first == last:
+        return None
+    lines = lines[first:last]
+    lines[0] = lines[0].lstrip()
+    lines[-1] = lines[-1].rstrip()
+    return Block(classify_lines(lines), lines, start_line + first, start_line + last - 1)
+
+def markdown_to_blocks(markdown):
+    return [block.text for block in iter_blocks(markdown.split("\n"))]
 
 def block_to_block_type(block):
-    lines = block.split("\n")
+    return classify_lines(block.split("\n"))
 
-    if block.startswith(("# ", "## ", "### ", "#### ", "##### ", "###### ")):
+def classify_lines(lines):
+    first = lines[0]
+    if first.startswith(HEADING_PREFIXES):
         return BlockType.HEADING
 
-    if len(lines) > 1 and lines[0].startswith("```") and lines[-1].startswith("```"):
+    if len(lines) > 1 and first.startswith("```") and lines[-1].startswith("```"):
         return BlockType.CODE
 
-    if block.startswith(">"):
-        if all(line.startswith(">") for line in lines):
-            return BlockType.QUOTE
-
-    if block.startswith("- "):
-        if all(line.startswith("- ") for line in lines):
-            return BlockType.ULIST
-
-    if block.startswith("1. "):
-        if all(re.match(r"^\d+\. ", line) for line in lines):
-            numbers = [int(line.split(".")[0]) for line in lines]
-            if all(numbers[i] == numbers[i-1] + 1 for i in range(1, len(numbers))):
-                return BlockType.OLIST
+    quote = first.startswith(">")
+    ulist = first.startswith("- ")
+    olist = first.startswith("1. ")
+    if not (quote or ulist or olist):
+        return BlockType.PARAGRAPH
 
+    number = 1
+    for line in lines:
+        quote = quote and line.startswith(">")
+        ulist = ulist and line.startswith("- ")
+        olist = olist and line.startswith(f"{number}. ")
+        number += 1
+
+    if quote:
+        return BlockType.QUOTE
+    if ulist:
+        return BlockType.ULIST
+    if olist:
+        return BlockType.OLIST
     return BlockType.PARAGRAPH
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
+def markdown_to_html_node(markdown, resolver=None):
+    if isinstance(markdown, str):
+        markdown = markdown.split("\n")
     children = []
-    for block in blocks:
-        html_node = block_to_html_node(block)
+    for block in iter_blocks(markdown):
+        html_node = block_to_html_node(block, resolver)
         children.append(html_node)
     return ParentNode("div", children, None)
 
 
-def block_to_html_node(block):
-    block_type = block_to_block_type(block)
+def block_to_html_node(block, resolver=None):
+    if isinstance(block, str):
+        lines = block.split("\n")
+        block_type = classify_lines(lines)
+    else:
+        lines = block.lines
+        block_type = block.block_type
     match block_type:
         case BlockType.HEADING:
-            return heading_to_html_node(block)
+            return heading_to_html_node(lines, resolver)
         case BlockType.CODE:
-            return code_to_html_node(block)
+            return code_to_html_node(lines)
         case BlockType.QUOTE:
-            return quote_to_html_node(block)
+            return quote_to_html_node(lines, resolver)
         case BlockType.ULIST:
-            return unordered_list_to_html_node(block)
+            return unordered_list_to_html_node(lines, resolver)
         case BlockType.OLIST:
-            return ordered_list_to_html_node(block)
+            return ordered_list_to_html_node(lines, resolver)
         case BlockType.PARAGRAPH:
-            return paragraph_to_html_node(block)
+            return paragraph_to_html_node(lines, resolver)
         case _:
             raise ValueError("invalid block type")
 
-def text_to_children(text):
+def text_to_children(text, resolver=None):
     text_nodes = text_to_textnodes(text)
-    return [TextNode.text_node_to_html_node(c) for c in text_nodes]
+    return [TextNode.text_node_to_html_node(c, resolver) for c in text_nodes]
 
-def heading_to_html_node(block):
-    lines = block.split(" ")
-    level = len(lines[0])
-    text = " ".join(lines[1:])
-    children = text_to_children(text)
+def heading_to_html_node(lines, resolver=None):
+    block = "\n".join(lines)
+    level = block.index(" ")
+    text = block[level + 1:]
+    children = text_to_children(text, resolver)
     return ParentNode("h" + str(level), children)
 
-def code_to_html_node(block):
-    lines = block.split("\n")
-    code = "\n".join(lines[1:-1])   
+def code_to_html_node(lines):
+    code = "\n".join(lines[1:-1])
     return ParentNode("pre", [LeafNode("code", code + "\n")])
 
-def quote_to_html_node(block):
-    lines = block.split("\n")
+def quote_to_html_node(lines, resolver=None):
     content = [line[2:] for line in lines]
     text = " ".join(content)
-    children = text_to_children(text)
+    children = text_to_children(text, resolver)
     return ParentNode("blockquote", children)
 
-def unordered_list_to_html_node(block):
-    lines = block.split("\n")
+def unordered_list_to_html_node(lines, resolver=None):
     children = []
     for line in lines:
         line_content = line[2:]
-        line_children = text_to_children(line_content)
+        line_children = text_to_children(line_content, resolver)
         children.append(ParentNode("li", line_children))
     return ParentNode("ul", children)
 
-def ordered_list_to_html_node(block):
-    lines = block.split("\n")
+def ordered_list_to_html_node(lines, resolver=None):
     children = []
     for line in lines:
-        line_content = re.sub(r"^\d+\. ", "", line)
-        line_children = text_to_children(line_content)
+        line_content = line[line.index(". ") + 2:]
+        line_children = text_to_children(line_content, resolver)
         children.append(ParentNode("li", line_children))
     return ParentNode("ol", children)
 
-def paragraph_to_html_node(block):
-    lines = block.split("\n")
+def paragraph_to_html_node(lines, resolver=None):
     text = " ".join(lines)
-    children = text_to_children(text)
-    return ParentNode("p", children)
\ No newline at end of file
+    children = text_to_children(text, resolver)
+    return ParentNode("p", children)
@@ -0,0 +1,120 @@
+import os
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css", ".js", ".mjs", ".json", ".svg", ".xml", ".txt", ".md")
+FORMATS = ("gz", "zst")
+DEFAULT_LEVELS = {"gz": 9, "zst": 19}
+LEVEL_RANGES = {"gz": (0, 9), "zst": (1, 22)}
+DEFAULT_MIN_SIZE = 1024
+
+
+def precompress_directory(
+    root, formats=("gz",), min_size=DEFAULT_MIN_SIZE, level=None, workers=None, assets=(),
+):
+    # Writes a .gz (and optionally .zst) sibling next to every text asset
+    # under root. Siblings carry their source's mtime, so a sibling with a
+    # matching mtime is already up to date. assets holds the root-relative
+    # paths of files copied from the static directory; those are shipped
+    # as they are, so they are never removed or overwritten as siblings.
+    # Returns (written, skipped, removed) lists of sibling paths.
+    compressors = {fmt: compressor(fmt, level) for fmt in formats}
+    tasks = []
+    skipped = []
+    removed = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        names = set(filenames)
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            base, ext = os.path.splitext(filename)
+            if ext[1:] in FORMATS and base.endswith(COMPRESSIBLE_EXTENSIONS):
+                if os.path.relpath(path, root) in assets:
+                    continue
+                if is_orphaned(path, os.path.join(dirpath, base), base in names, ext[1:] in formats, min_size):
+                    os.remove(path)
+                    removed.append(path)
+                continue
+            if not filename.endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            st = os.stat(path)
+            if st.st_size < min_size:
+                continue
+            for fmt in formats:
+                sibling = f"{path}.{fmt}"
+                if os.path.relpath(sibling, root) in assets:
+                    continue
+                if is_up_to_date(sibling, st):
+                    skipped.append(sibling)
+                else:
+                    tasks.append((path, sibling, compressors[fmt]))
+
+    if not tasks:
+        return [], skipped, removed
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    # zlib and zstd release the GIL while compressing, so threads are
+    # enough to use every core.
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        written = list(pool.map(lambda task: compress_file(*task), tasks))
+    return written, skipped, removed
+
+
+def is_orphaned(sibling, source, source_exists, requested, min_size):
+    # Siblings of deleted or now too small sources are removed, as are
+    # stale siblings in a format this build no longer writes.
+    if not source_exists:
+        return True
+    st = os.stat(source)
+    if st.st_size < min_size:
+        return True
+    return not requested and not is_up_to_date(sibling, st)
+
+
+def is_up_to_date(sibling, source_stat):
+    try:
+        return os.stat(sibling).st_mtime_ns == source_stat.st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def compress_file(path, sibling, compress):
+    with open(path, "rb") as f:
+        st = os.fstat(f.fileno())
+        data = f.read()
+    tmp_path = f"{sibling}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(compress(data))
+        os.utime(tmp_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        os.replace(tmp_path, sibling)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return sibling
+
+
+def compressor(fmt, level=None):
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown compression format: {fmt}")
+    level = DEFAULT_LEVELS[fmt] if level is None else level
+    low, high = LEVEL_RANGES[fmt]
+    if not low <= level <= high:
+        raise ValueError(f"{fmt} compression level must be between {low} and {high}, got {level}")
+    if fmt == "gz":
+        import gzip
+
+        # mtime=0 keeps the output identical for identical input.
+        return lambda data: gzip.compress(data, compresslevel=level, mtime=0)
+    try:
+        from compression import zstd
+
+        return lambda data: zstd.compress(data, level=level)
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError("zst output needs Python 3.14+ or the zstandard package") from None
+    # A ZstdCompressor must not be shared between threads.
+    return lambda data: zstandard.ZstdCompressor(level=level).compress(data)
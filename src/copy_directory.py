@@ -1,17 +1,162 @@
 import os
-import shutil
-
-def copy_directory(src_dir, dst_dir):
-    if os.path.exists(dst_dir):
-        shutil.rmtree(dst_dir)
-    os.makedirs(dst_dir)
-
-    items = os.listdir(src_dir)
-    for item in items:
-        src_path = os.path.join(src_dir, item)
-        dst_path = os.path.join(dst_dir, item)
-        if os.path.isfile(src_path):
-            shutil.copy(src_path, dst_path)
-            print(f"Copied file: {src_path} -> {dst_path}")
-        else: 
-            copy_directory(src_path, dst_path)
\ No newline at end of file
+
+from manifest import file_hash
+
+
+def sync_directory(src_dir, dst_dir, assets=None, checksum=False, hardlink=False, png_optimizer=None, files=None):
+    if assets is None:
+        assets = {}
+    if files is None:
+        files = list_files(src_dir)
+    seen = set()
+    copied = []
+    for rel_path in files:
+        seen.add(rel_path)
+        if sync_file(src_dir, dst_dir, rel_path, assets, checksum, hardlink, png_optimizer):
+            copied.append(os.path.join(dst_dir, rel_path))
+
+    removed = [remove_synced_file(dst_dir, rel_path, assets) for rel_path in sorted(set(assets) - seen)]
+    return copied, removed
+
+
+def sync_file(src_dir, dst_dir, rel_path, assets, checksum=False, hardlink=False, png_optimizer=None):
+    src_path = os.path.join(src_dir, rel_path)
+    dst_path = os.path.join(dst_dir, rel_path)
+    st = os.stat(src_path)
+    record = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    if checksum:
+        record["hash"] = file_hash(src_path)
+    previous = assets.get(rel_path)
+    optimize = png_optimizer is not None and rel_path.lower().endswith(".png")
+    if optimize:
+        # An optimized copy differs from its source, so it is only current
+        # if the previous build optimized this same source.
+        if previous is not None and "dest_size" in previous and same_source(record, previous):
+            record["dest_size"] = previous["dest_size"]
+            current = is_current(dst_path, record, previous)
+        else:
+            current = False
+    else:
+        current = is_current(dst_path, record, previous)
+    assets[rel_path] = record
+    if current:
+        return False
+    if optimize:
+        data = png_optimizer.optimize_file(src_path)
+        write_file(dst_path, data, st)
+        record["dest_size"] = len(data)
+        print(f"Optimized file: {src_path} -> {dst_path} ({st.st_size} -> {len(data)} bytes)")
+        return True
+    copy_file(src_path, dst_path, hardlink)
+    print(f"Copied file: {src_path} -> {dst_path}")
+    return True
+
+
+def remove_synced_file(dst_dir, rel_path, assets):
+    assets.pop(rel_path, None)
+    dst_path = os.path.join(dst_dir, rel_path)
+    if os.path.isfile(dst_path):
+        os.remove(dst_path)
+        print(f"Removed stale file: {dst_path}")
+    return dst_path
+
+
+def list_files(root):
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            files.append(os.path.relpath(os.path.join(dirpath, filename), root))
+    return files
+
+
+def is_current(dst_path, record, previous):
+    try:
+        dst = os.stat(dst_path)
+    except FileNotFoundError:
+        return False
+    if dst.st_size != record.get("dest_size", record["size"]):
+        return False
+    if "hash" in record:
+        if previous is not None and previous.get("hash") == record["hash"]:
+            return True
+        return file_hash(dst_path) == record["hash"]
+    return dst.st_mtime_ns == record["mtime_ns"]
+
+
+def same_source(record, previous):
+    if record["size"] != previous["size"]:
+        return False
+    if "hash" in record and "hash" in previous:
+        return record["hash"] == previous["hash"]
+    return record["mtime_ns"] == previous["mtime_ns"]
+
+
+def write_file(dst_path, data, src_stat):
+    # Writes data with the permissions and mtime of the file it replaces a
+    # copy of, like copy_file does through copystat.
+    import tempfile
+
+    dst_dir = os.path.dirname(dst_path)
+    os.makedirs(dst_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dst_dir, prefix=".", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.chmod(tmp_path, src_stat.st_mode & 0o7777)
+        os.utime(tmp_path, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def copy_file(src_path, dst_path, hardlink=False):
+    # shutil and tempfile are only needed once something has to be copied,
+    # which an up-to-date incremental build never does.
+    import shutil
+    import tempfile
+
+    dst_dir = os.path.dirname(dst_path)
+    os.makedirs(dst_dir, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dst_dir, prefix=".", suffix=".tmp")
+    os.close(fd)
+    try:
+        if not (hardlink and _link(src_path, tmp_path)):
+            _copy_contents(src_path, tmp_path)
+            shutil.copystat(src_path, tmp_path)
+        os.replace(tmp_path, dst_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _link(src_path, tmp_path):
+    try:
+        os.remove(tmp_path)
+        os.link(src_path, tmp_path)
+        return True
+    except OSError:
+        return False
+
+
+def _copy_contents(src_path, dst_path):
+    if hasattr(os, "copy_file_range"):
+        with open(src_path, "rb") as fsrc, open(dst_path, "wb") as fdst:
+            try:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    sent = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if sent == 0:
+                        break
+                    remaining -= sent
+                if remaining == 0:
+                    return
+            except OSError:
+                pass
+    import shutil
+
+    # shutil.copyfile uses sendfile() where the platform supports it.
+    shutil.copyfile(src_path, dst_path)
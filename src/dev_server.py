@@ -0,0 +1,239 @@
+import hashlib
+import mimetypes
+import os
+import posixpath
+import stat
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import quote, unquote, urlsplit
+
+from compress import COMPRESSIBLE_EXTENSIONS, DEFAULT_MIN_SIZE, compressor
+from generate_page import fill_template, parse_page_file
+from template import TemplateLoader
+from urls import as_resolver
+
+DEFAULT_MAX_ENTRIES = 1024
+GZIP_LEVEL = 6
+
+
+class CachedFile:
+    __slots__ = ("stamp", "body", "content_type", "etag", "compressible", "gzipped")
+
+    def __init__(self, stamp, body, content_type, compressible):
+        self.stamp = stamp
+        self.body = body
+        self.content_type = content_type
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.compressible = compressible and len(body) >= DEFAULT_MIN_SIZE
+        self.gzipped = None
+
+    def __repr__(self):
+        return f"CachedFile({self.content_type}, {len(self.body)} bytes, {self.etag})"
+
+
+class Response:
+    def __init__(self, status, headers=None, body=b""):
+        self.status = status
+        self.headers = headers if headers is not None else {}
+        self.body = body
+
+    def __repr__(self):
+        return f"Response({self.status}, {len(self.body)} bytes)"
+
+
+class DevServer:
+    # Renders pages on request instead of building the site up front. Each
+    # response is kept in memory until its source file's mtime or size, or
+    # its template, changes, so a page costs one stat() per request after
+    # the first render.
+    def __init__(
+        self, content_dir, static_dir, template_path, basepath="/", template_overrides=None,
+        max_entries=DEFAULT_MAX_ENTRIES, resolver=None,
+    ):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.basepath = basepath
+        self.prefix = basepath if basepath.startswith("/") else "/"
+        if not self.prefix.endswith("/"):
+            self.prefix += "/"
+        self.templates = TemplateLoader(
+            template_path, template_overrides, as_resolver(basepath if resolver is None else resolver)
+        )
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # Requests are handled on threads. Rendering goes through the shared
+        # block cache, which is not thread-safe, so cache lookups and loads
+        # are serialized; sending cached responses is not.
+        self.lock = threading.Lock()
+
+    def __repr__(self):
+        return f"DevServer({self.content_dir}, {len(self.entries)} cached, {self.hits} hits, {self.misses} misses)"
+
+    def respond(self, url, headers=None):
+        headers = headers if headers is not None else {}
+        path = unquote(urlsplit(url).path)
+        if path + "/" == self.prefix:
+            return redirect(self.prefix)
+        rel_path = self.relative_path(path)
+        if rel_path is None:
+            return not_found(path)
+
+        if not rel_path or path.endswith("/"):
+            source = posixpath.join(rel_path, "index.md")
+        elif rel_path.endswith(".html"):
+            source = rel_path[: -len(".html")] + ".md"
+        else:
+            source = None
+        try:
+            cached = None
+            if source is not None:
+                cached = self.page(source)
+            if cached is None and not path.endswith("/"):
+                cached = self.static_file(rel_path)
+        except (OSError, ValueError) as e:
+            message = f"Error serving {path}: {type(e).__name__}: {e}"
+            print(message)
+            return Response(500, {"Content-Type": "text/plain; charset=utf-8"}, message.encode())
+        if cached is None:
+            if source is None and os.path.isfile(self.content_path(posixpath.join(rel_path, "index.md"))):
+                return redirect(quote(path + "/"))
+            return not_found(path)
+        return self.cached_response(cached, headers)
+
+    def relative_path(self, path):
+        if not path.startswith(self.prefix):
+            return None
+        # Normalizing against "/" keeps ".." from escaping the site root.
+        rel_path = posixpath.normpath("/" + path[len(self.prefix):]).lstrip("/")
+        return "" if rel_path == "." else rel_path
+
+    def content_path(self, rel_path):
+        return os.path.join(self.content_dir, *rel_path.split("/"))
+
+    def page(self, source):
+        from_path = self.content_path(source)
+        template = self.templates.for_page(source)
+        resolver = self.templates.resolver_for(source)
+        return self.lookup(
+            ("page", source), from_path, template.digest, lambda: self.render(from_path, template, resolver)
+        )
+
+    def render(self, from_path, template, resolver):
+        page = parse_page_file(from_path, resolver=resolver)
+        html = "".join(fill_template(template, page.title, page.content))
+        print(f"Rendered {from_path}")
+        return html.encode("utf-8"), "text/html; charset=utf-8", True
+
+    def static_file(self, rel_path):
+        path = os.path.join(self.static_dir, *rel_path.split("/"))
+        return self.lookup(("static", rel_path), path, None, lambda: read_static(path))
+
+    def lookup(self, key, path, version, load):
+        try:
+            st = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            with self.lock:
+                self.entries.pop(key, None)
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        stamp = (st.st_mtime_ns, st.st_size, version)
+        with self.lock:
+            cached = self.entries.get(key)
+            if cached is not None and cached.stamp == stamp:
+                self.hits += 1
+                self.entries.move_to_end(key)
+                return cached
+
+            self.misses += 1
+            cached = CachedFile(stamp, *load())
+            self.entries[key] = cached
+            self.entries.move_to_end(key)
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+            return cached
+
+    def cached_response(self, cached, headers):
+        body, etag = cached.body, cached.etag
+        response_headers = {"Content-Type": cached.content_type, "Cache-Control": "no-cache"}
+        if cached.compressible:
+            response_headers["Vary"] = "Accept-Encoding"
+            if accepts_gzip(headers.get("Accept-Encoding", "")):
+                if cached.gzipped is None:
+                    cached.gzipped = compressor("gz", GZIP_LEVEL)(cached.body)
+                body, etag = cached.gzipped, etag[:-1] + '-gzip"'
+                response_headers["Content-Encoding"] = "gzip"
+        response_headers["ETag"] = etag
+        if etag_matches(headers.get("If-None-Match"), etag):
+            response_headers.pop("Content-Encoding", None)
+            return Response(304, response_headers)
+        return Response(200, response_headers, body)
+
+
+def read_static(path):
+    with open(path, "rb") as f:
+        body = f.read()
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if content_type.startswith("text/"):
+        content_type += "; charset=utf-8"
+    return body, content_type, path.lower().endswith(COMPRESSIBLE_EXTENSIONS)
+
+
+def accepts_gzip(accept_encoding):
+    for coding in accept_encoding.split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() in ("gzip", "*"):
+            q = params.strip().replace(" ", "")
+            return q not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+    return False
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+def redirect(location):
+    return Response(301, {"Location": location, "Content-Type": "text/plain; charset=utf-8"}, b"")
+
+
+def not_found(path):
+    return Response(404, {"Content-Type": "text/plain; charset=utf-8"}, f"Not found: {path}\n".encode())
+
+
+class DevRequestHandler(BaseHTTPRequestHandler):
+    server_version = "static-site-generator"
+
+    def do_GET(self):
+        self.send(self.server.site.respond(self.path, self.headers))
+
+    def do_HEAD(self):
+        self.send(self.server.site.respond(self.path, self.headers), include_body=False)
+
+    def send(self, response, include_body=True):
+        self.send_response(response.status)
+        for name, value in response.headers.items():
+            self.send_header(name, value)
+        if response.status != 304:
+            self.send_header("Content-Length", str(len(response.body)))
+        self.end_headers()
+        if include_body and response.body:
+            self.wfile.write(response.body)
+
+
+def make_server(site, host="localhost", port=8888):
+    httpd = ThreadingHTTPServer((host, port), DevRequestHandler)
+    httpd.daemon_threads = True
+    httpd.site = site
+    return httpd
+
+
+def run_server(site, host="localhost", port=8888):
+    with make_server(site, host, port) as httpd:
+        httpd.serve_forever()
@@ -1,37 +1,268 @@
+import functools
+import hashlib
+import io
 import os
 
-from click import Path
-from block_markdown import markdown_to_html_node
+from block_cache import block_cache
+from htmlnode import HtmlNode
+from manifest import file_hash
+from page import Page, compile_page
+from profiling import NULL_PROFILER, Profiler
+from scheduler import map_ordered
+from sharding import shard_pages
+from stats import counter_delta
+from template import TemplateLoader, load_template
+from urls import as_resolver
 
+WRITE_BUFFER_SIZE = 1 << 16
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, basepath):
-    list_of_files = os.listdir(dir_path_content)
-    for filename in list_of_files:
+
+def find_pages(dir_path_content, dest_dir_path):
+    pages = []
+    for filename in sorted(os.listdir(dir_path_content)):
         from_path = os.path.join(dir_path_content, filename)
         dest_path = os.path.join(dest_dir_path, filename.replace(".md", ".html"))
         if os.path.isfile(from_path):
-            generate_page(from_path, template_path, dest_path, basepath)
+            pages.append((from_path, dest_path))
+        else:
+            pages.extend(find_pages(from_path, dest_path))
+    return pages
+
+
+def page_dest_path(rel_path, dest_dir_path):
+    parts = [part.replace(".md", ".html") for part in rel_path.split(os.sep)]
+    return os.path.join(dest_dir_path, *parts)
+
+
+def generate_pages_recursive(
+    dir_path_content, template_path, dest_dir_path, basepath, manifest=None, jobs=1, template_overrides=None,
+    profiler=NULL_PROFILER, stats=None, parse_cache=None, shard=None, resolver=None,
+):
+    pages = shard_pages(find_pages(dir_path_content, dest_dir_path), dir_path_content, shard)
+    return generate_pages(
+        pages, dir_path_content, template_path, basepath, manifest, jobs, template_overrides, profiler, stats,
+        parse_cache, resolver,
+    )
+
+
+def generate_pages(
+    pages, dir_path_content, template_path, basepath, manifest=None, jobs=1, template_overrides=None,
+    profiler=NULL_PROFILER, stats=None, parse_cache=None, resolver=None,
+):
+    # URLs are resolved while rendering: by default root-relative links,
+    # images and template attributes are prefixed with basepath.
+    resolver = as_resolver(basepath if resolver is None else resolver)
+    templates = TemplateLoader(template_path, template_overrides, resolver)
+    pending = []
+    for from_path, dest_path in pages:
+        rel_path = os.path.relpath(from_path, dir_path_content)
+        template = templates.for_page(rel_path)
+        hashes = None
+        if manifest is not None:
+            hashes = (file_hash(from_path), template.digest)
+            if manifest.is_fresh(from_path, *hashes, basepath, dest_path):
+                print(f"Skipping unchanged page {from_path}")
+                if stats is not None:
+                    stats.add("pages_fresh")
+                continue
+        pending.append((from_path, dest_path, templates.path_for(rel_path), template, hashes, rel_path))
+
+    errors = []
+    cache_counters = block_cache.counters()
+    # Serial builds stream each node tree straight into the output file;
+    # worker processes and the parse cache produce rendered strings.
+    if parse_cache is not None:
+        if jobs <= 1:
+            render = functools.partial(cached_render_page_file, cache=parse_cache, profiler=profiler)
+        elif profiler.enabled:
+            render = functools.partial(profile_cached_render_page_file, cache=parse_cache)
         else:
-            generate_pages_recursive(from_path, template_path, dest_path, basepath)
+            render = functools.partial(cached_render_page_file, cache=parse_cache)
+    elif jobs <= 1:
+        render = functools.partial(parse_page_file, profiler=profiler)
+    elif profiler.enabled:
+        render = profile_render_page_file
+    else:
+        render = render_page_file
+    render = functools.partial(render_job, render, resolver, block_cache.max_bytes)
+    results = map_ordered(render, [(p[0], p[5]) for p in pending], jobs)
+    for (from_path, dest_path, page_template_path, template, hashes, _), (result, error) in zip(pending, results):
+        if error is None:
+            print(f"Generating page from {from_path} to {dest_path} using {page_template_path}")
+            page, *extra = result if isinstance(result, tuple) else (result,)
+            content, page_title = page.content, page.title
+            if extra and stats is not None:
+                stats.merge(extra[0])
+            if len(extra) > 1:
+                profiler.events.extend(extra[1])
+            try:
+                if profiler.enabled:
+                    written, output_hash = write_page_profiled(
+                        dest_path, template, page_title, content, profiler, from_path
+                    )
+                else:
+                    written, output_hash = write_page(dest_path, fill_template(template, page_title, content))
+            except ValueError as e:
+                error = f"{type(e).__name__}: {e}"
+        if error is not None:
+            print(f"Error generating page {from_path}: {error}")
+            errors.append((from_path, error))
+            continue
+        if stats is not None:
+            stats.add("pages_written" if written else "pages_identical")
+        if manifest is not None:
+            manifest.record(from_path, *hashes, basepath, dest_path, output_hash)
+    if stats is not None and jobs <= 1 and parse_cache is None:
+        stats.merge(counter_delta(block_cache.counters(), cache_counters))
+    return errors
 
 
 def generate_page(from_path, template_path, dest_path, basepath):
     print(f"Generating page from {from_path} to {dest_path} using {template_path}")
+    resolver = as_resolver(basepath)
+    page = parse_page_file(from_path, resolver=resolver)
+    template = load_template(template_path, resolver)
+    return write_page(dest_path, fill_template(template, page.title, page.content))
+
+
+def render_job(render, resolver, block_cache_bytes, job):
+    # Jobs carry the page's content-relative path rather than its resolver,
+    # so per-page resolvers are made in the worker that renders the page.
+    # Workers that were not forked from the build start with the default
+    # block cache size, so the configured one travels with each job.
+    if block_cache.max_bytes != block_cache_bytes:
+        block_cache.resize(block_cache_bytes)
+    from_path, rel_path = job
+    if resolver is not None:
+        resolver = resolver.for_page(rel_path.replace(os.sep, "/"))
+    return render(from_path, resolver=resolver)
+
+
+def render_page_file(from_path, resolver=None):
+    cache_counters = block_cache.counters()
+    page = parse_page_file(from_path, resolver=resolver).rendered()
+    return page, counter_delta(block_cache.counters(), cache_counters)
+
+
+def profile_render_page_file(from_path, resolver=None):
+    cache_counters = block_cache.counters()
+    profiler = Profiler()
+    page = parse_page_file(from_path, profiler, resolver)
+    with profiler.stage("render", from_path):
+        page = page.rendered()
+    profiler.stop()
+    return page, counter_delta(block_cache.counters(), cache_counters), profiler.events
+
+
+def cached_render_page_file(from_path, cache, profiler=NULL_PROFILER, resolver=None):
+    cache_counters = block_cache.counters()
+    with profiler.stage("read", from_path):
+        with open(from_path, "rb") as f:
+            data = f.read()
+    key = cache.key(data, resolver)
+    entry = cache.get(key)
+    if entry is not None:
+        return Page.from_dict(from_path, entry), {"parse_cache_hits": 1}
+
+    # Decoding through TextIOWrapper matches open(from_path, "r") exactly,
+    # newline translation included.
+    page = compile_page(io.TextIOWrapper(io.BytesIO(data)), from_path, profiler, resolver)
+    with profiler.stage("render", from_path):
+        page = page.rendered()
+    try:
+        cache.put(key, page.to_dict())
+    except OSError as e:
+        print(f"Cannot write parse cache entry for {from_path}: {e}")
+    counters = counter_delta(block_cache.counters(), cache_counters)
+    counters["parse_cache_misses"] = 1
+    return page, counters
+
+
+def profile_cached_render_page_file(from_path, cache, resolver=None):
+    profiler = Profiler()
+    result = cached_render_page_file(from_path, cache, profiler, resolver)
+    profiler.stop()
+    return *result, profiler.events
+
+
+def parse_page_file(from_path, profiler=NULL_PROFILER, resolver=None):
     with open(from_path, "r") as f:
-        content = f.read()
-        html_string = markdown_to_html_node(content).to_html()
-        page_title = extract_title(content)
-
-    with open(template_path, "r") as f:
-        template = f.read()
-        template = template.replace("{{ Title }}", page_title)
-        template = template.replace("{{ Content }}", html_string)
-        template = template.replace('href="/', 'href="' + basepath)
-        template = template.replace('src="/', 'src="' + basepath)
-
-    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
-    with open(dest_path, "w") as f:
-        f.write(template)
+        if profiler.enabled:
+            # Profiled builds materialize each step so read, block parse and
+            # inline parse can be timed separately.
+            with profiler.stage("read", from_path):
+                lines = f.readlines()
+            return compile_page(lines, from_path, profiler, resolver)
+        return compile_page(f, from_path, profiler, resolver)
+
+
+def fill_template(template, page_title, content):
+    # Content URLs were resolved when the page was compiled and template
+    # URLs when the template was, so the page is not rescanned here.
+    chunks = content.iter_html() if isinstance(content, HtmlNode) else content
+    return template.iter_render(Title=page_title, Content=chunks)
+
+
+def write_page_profiled(dest_path, template, page_title, content, profiler, page=None):
+    if isinstance(content, HtmlNode):
+        with profiler.stage("render", page):
+            content = content.to_html()
+    with profiler.stage("template", page):
+        html = "".join(fill_template(template, page_title, content))
+    with profiler.stage("write", page):
+        return write_page(dest_path, html)
+
+
+def write_page(dest_path, chunks):
+    # Streams the page into a temp file next to dest_path while hashing it.
+    # An identical existing file is left untouched so its mtime survives
+    # for rsync and CDN uploads; otherwise the temp file replaces it
+    # atomically. Returns (written, sha256 hex digest).
+    if isinstance(chunks, str):
+        chunks = [chunks]
+    dest_dir = os.path.dirname(dest_path)
+    os.makedirs(dest_dir, exist_ok=True)
+    tmp_path = os.path.join(dest_dir, f".{os.path.basename(dest_path)}.{os.getpid()}.tmp")
+    h = hashlib.sha256()
+    size = 0
+    try:
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666), "wb") as f:
+            buffer = []
+            buffered = 0
+            for chunk in chunks:
+                buffer.append(chunk)
+                buffered += len(chunk)
+                if buffered >= WRITE_BUFFER_SIZE:
+                    size += _write_hashed(f, h, buffer)
+                    buffer = []
+                    buffered = 0
+            size += _write_hashed(f, h, buffer)
+        output_hash = h.hexdigest()
+        if _same_file_contents(dest_path, size, output_hash):
+            os.remove(tmp_path)
+            return False, output_hash
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True, output_hash
+
+
+def _write_hashed(f, h, chunks):
+    data = "".join(chunks).encode("utf-8")
+    h.update(data)
+    f.write(data)
+    return len(data)
+
+
+def _same_file_contents(path, size, output_hash):
+    try:
+        if os.stat(path).st_size != size:
+            return False
+        return file_hash(path) == output_hash
+    except FileNotFoundError:
+        return False
 
 
 def extract_title(md):
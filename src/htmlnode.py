@@ -1,4 +1,6 @@
 class HtmlNode:
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag: str=None, value: str=None, children: list=None, props: dict=None):
         self.tag = tag
         self.value = value
@@ -10,6 +12,12 @@ class HtmlNode:
     
     def to_html(self):
         raise NotImplementedError("to_html must be implemented by subclasses")
+
+    def iter_html(self):
+        yield self.to_html()
+
+    def write_to(self, fp):
+        fp.writelines(self.iter_html())
     
     def props_to_html(self):
         if self.props is None:
@@ -18,6 +26,8 @@ class HtmlNode:
 
 
 class LeafNode(HtmlNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, value: str, props: dict=None):
         super().__init__(tag, value, None, props)
 
@@ -31,15 +41,68 @@ class LeafNode(HtmlNode):
         return f"<{self.tag}{props_html}>{self.value}</{self.tag}>"
 
 class ParentNode(HtmlNode):
+    __slots__ = ()
+
     def __init__(self, tag: str, children: list, props: dict=None):
         super().__init__(tag, None, children, props)
 
     def to_html(self):
-        if self.tag is None or self.tag == "":
-            raise ValueError("tag is required")
-        if self.children is None:
-            raise ValueError("children is required")
-        inner_html = "".join(child.to_html() for child in self.children)
-        props_html = self.props_to_html()
-        props_html = f" {props_html}" if props_html else ""
-        return f"<{self.tag}{props_html}>{inner_html}</{self.tag}>"
\ No newline at end of file
+        return render_html(self)
+
+    def iter_html(self):
+        return iter_html_chunks(self)
+
+
+def render_html(root):
+    # Same traversal as iter_html_chunks, collecting into one list so the
+    # page is joined exactly once.
+    out = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if node.__class__ is str:
+            out.append(node)
+        elif node.__class__ is LeafNode:
+            if node.value is None:
+                raise ValueError("value is required")
+            if not node.tag:
+                out.append(node.value)
+            elif node.props:
+                out.append(f"<{node.tag} {node.props_to_html()}>{node.value}</{node.tag}>")
+            else:
+                out.append(f"<{node.tag}>{node.value}</{node.tag}>")
+        elif isinstance(node, ParentNode):
+            if node.tag is None or node.tag == "":
+                raise ValueError("tag is required")
+            if node.children is None:
+                raise ValueError("children is required")
+            out.append(f"<{node.tag} {node.props_to_html()}>" if node.props else f"<{node.tag}>")
+            stack.append(f"</{node.tag}>")
+            stack.extend(reversed(node.children))
+        else:
+            out.append(node.to_html())
+    return "".join(out)
+
+
+def iter_html_chunks(root):
+    # Walks the tree with an explicit stack so deeply nested documents
+    # never approach the recursion limit. Closing tags are pushed as
+    # strings and emitted when popped.
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            yield node
+        elif isinstance(node, ParentNode):
+            if node.tag is None or node.tag == "":
+                raise ValueError("tag is required")
+            if node.children is None:
+                raise ValueError("children is required")
+            props_html = node.props_to_html()
+            yield f"<{node.tag} {props_html}>" if props_html else f"<{node.tag}>"
+            stack.append(f"</{node.tag}>")
+            stack.extend(reversed(node.children))
+        elif isinstance(node, LeafNode):
+            yield node.to_html()
+        else:
+            yield from node.iter_html()
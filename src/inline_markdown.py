@@ -17,75 +17,74 @@ def split_nodes_delimiter(old_nodes: list, delimiter: str, text_type: TextType):
             new_nodes.append(TextNode(sections[i], node_type))
     return new_nodes
 
+IMAGE_PATTERN = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+LINK_PATTERN = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
+
+
 def extract_markdown_images(text):
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return IMAGE_PATTERN.findall(text)
 
 
 def extract_markdown_links(text):
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return LINK_PATTERN.findall(text)
 
 def split_nodes_image(old_nodes):
-    new_nodes = []
-    for old_node in old_nodes:
-        if old_node.text_type != TextType.NORMAL:
-            new_nodes.append(old_node)
-            continue
-        original_text = old_node.text
-        images = extract_markdown_images(original_text)
-        if len(images) == 0:
-            new_nodes.append(old_node)
-            continue
-        for image in images:
-            sections = original_text.split(f"![{image[0]}]({image[1]})", 1)
-            if len(sections) != 2:
-                raise ValueError("invalid markdown, image section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.NORMAL))
-            new_nodes.append(
-                TextNode(
-                    image[0],
-                    TextType.IMAGE,
-                    image[1],
-                )
-            )
-            original_text = sections[1]
-        if original_text != "":
-            new_nodes.append(TextNode(original_text, TextType.NORMAL))
-    return new_nodes
+    return split_nodes_pattern(old_nodes, IMAGE_PATTERN, TextType.IMAGE)
 
 
 def split_nodes_link(old_nodes):
+    return split_nodes_pattern(old_nodes, LINK_PATTERN, TextType.LINK)
+
+def split_nodes_pattern(old_nodes, pattern, text_type):
     new_nodes = []
     for old_node in old_nodes:
         if old_node.text_type != TextType.NORMAL:
             new_nodes.append(old_node)
             continue
-        original_text = old_node.text
-        links = extract_markdown_links(original_text)
-        if len(links) == 0:
+        text = old_node.text
+        pos = 0
+        for match in pattern.finditer(text):
+            if match.start() > pos:
+                new_nodes.append(TextNode(text[pos:match.start()], TextType.NORMAL))
+            new_nodes.append(TextNode(match.group(1), text_type, match.group(2)))
+            pos = match.end()
+        if pos == 0:
             new_nodes.append(old_node)
-            continue
-        for link in links:
-            sections = original_text.split(f"[{link[0]}]({link[1]})", 1)
-            if len(sections) != 2:
-                raise ValueError("invalid markdown, link section not closed")
-            if sections[0] != "":
-                new_nodes.append(TextNode(sections[0], TextType.NORMAL))
-            new_nodes.append(TextNode(link[0], TextType.LINK, link[1]))
-            original_text = sections[1]
-        if original_text != "":
-            new_nodes.append(TextNode(original_text, TextType.NORMAL))
+        elif pos < len(text):
+            new_nodes.append(TextNode(text[pos:], TextType.NORMAL))
     return new_nodes
 
+# One alternation per inline construct, tried at each position from left to
+# right. The last group catches an opening delimiter that is never closed.
+INLINE_PATTERN = re.compile(
+    IMAGE_PATTERN.pattern
+    + "|" + LINK_PATTERN.pattern
+    + r"|\*\*(.*?)\*\*"
+    + r"|_(.*?)_"
+    + r"|`(.*?)`"
+    + r"|(\*\*|_|`)",
+    re.DOTALL,
+)
+DELIMITED_TYPES = {5: TextType.BOLD, 6: TextType.ITALIC, 7: TextType.CODE}
+
+
 def text_to_textnodes(text: str):
-    nodes = [TextNode(text, TextType.NORMAL)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    nodes = []
+    plain_start = 0
+    for match in INLINE_PATTERN.finditer(text):
+        group = match.lastindex
+        if group == 8:
+            raise ValueError(f"No closing delimiter {match.group(8)} found in text '{text}'")
+        start = match.start()
+        if start > plain_start:
+            nodes.append(TextNode(text[plain_start:start], TextType.NORMAL))
+        plain_start = match.end()
+        if group == 2:
+            nodes.append(TextNode(match.group(1), TextType.IMAGE, match.group(2)))
+        elif group == 4:
+            nodes.append(TextNode(match.group(3), TextType.LINK, match.group(4)))
+        elif match.group(group):
+            nodes.append(TextNode(match.group(group), DELIMITED_TYPES[group]))
+    if plain_start < len(text):
+        nodes.append(TextNode(text[plain_start:], TextType.NORMAL))
     return nodes
@@ -1,20 +1,417 @@
+import argparse
+import os
 import sys
-from copy_directory import copy_directory
-from generate_page import generate_pages_recursive
+import time
+from block_cache import DEFAULT_MAX_BYTES as DEFAULT_BLOCK_CACHE_BYTES, block_cache
+from compress import DEFAULT_MIN_SIZE, FORMATS, compressor, precompress_directory
+from copy_directory import list_files, remove_synced_file, sync_directory, sync_file
+from generate_page import generate_pages, generate_pages_recursive, page_dest_path
+from manifest import BuildManifest
+from parse_cache import DEFAULT_MAX_BYTES, ParseCache
+from profiling import NULL_PROFILER, Profiler
+from scheduler import resolve_jobs
+from sharding import ShardConflict, find_shard_manifests, load_shard_manifest, merge_shards, parse_shard, shard_files
+from stats import BuildStats
+from template import load_template
+from urls import BasepathResolver, RelativeResolver, load_asset_map
 
 static_dir_path = "./static"
 public_dir_path = "./docs"
 content_dir_path = "./content"
 template_path = "./template.html"
+manifest_path = "./.build-manifest.json"
+asset_cache_path = "./.asset-cache"
 default_basepath = "./"
 
-def main():
-    basepath = default_basepath
-    if len(sys.argv) > 1:
-        basepath = sys.argv[1]
-    
-    copy_directory(static_dir_path, public_dir_path)
-    generate_pages_recursive(content_dir_path, template_path, public_dir_path, basepath)
+COMMANDS = ("build", "watch", "merge", "serve")
 
 
-main()
+def parse_args(argv):
+    command = "build"
+    if argv and argv[0] in COMMANDS:
+        command, argv = argv[0], argv[1:]
+
+    parser = argparse.ArgumentParser(prog=f"main.py {command}", description=f"{command.capitalize()} the static site.")
+    if command == "merge":
+        parser.add_argument(
+            "manifests", nargs="*",
+            help=f"shard manifests to combine into {manifest_path} (default: every one next to it)",
+        )
+        add_compress_arguments(parser)
+        args = parser.parse_args(argv)
+        check_compress_level(parser, args)
+        args.command = command
+        return args
+    if command == "serve":
+        parser.add_argument("basepath", nargs="?", default="/")
+        add_template_argument(parser)
+        add_url_arguments(parser)
+        parser.add_argument("--bind", default="localhost", metavar="ADDRESS", help="address to listen on")
+        parser.add_argument("-p", "--port", type=int, default=8888, help="port to listen on (default: %(default)s)")
+        add_block_cache_argument(parser)
+        args = parser.parse_args(argv)
+        args.command = command
+        return args
+
+    parser.add_argument("basepath", nargs="?", default=default_basepath)
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1,
+        help="number of worker processes for page generation (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--async-io", action="store_true",
+        help="overlap page reads and writes with parsing using asyncio and a thread pool (not with --jobs)",
+    )
+    parser.add_argument("--io-workers", type=int, default=8, help="threads doing file I/O for --async-io")
+    parser.add_argument(
+        "--max-pending", type=int, default=64, help="pages in flight at once with --async-io (bounds memory)"
+    )
+    add_template_argument(parser)
+    add_url_arguments(parser)
+    parser.add_argument(
+        "--checksum", action="store_true",
+        help="compare static files by content hash instead of size and mtime",
+    )
+    parser.add_argument(
+        "--hardlink", action="store_true",
+        help="hardlink static files into the output directory instead of copying them",
+    )
+    parser.add_argument(
+        "--optimize-png", action="store_true",
+        help="losslessly recompress static PNGs; results are cached in --cache-dir or ./.asset-cache",
+    )
+    parser.add_argument(
+        "--profile", nargs="?", const="build-profile.json", metavar="TRACE",
+        help="record per-stage timings and allocations and write a Chrome trace (default: build-profile.json)",
+    )
+    parser.add_argument("--slowest", type=int, default=10, help="pages to list in the --profile report")
+    parser.add_argument(
+        "--cache-dir", metavar="DIR",
+        help="keep rendered pages in DIR, keyed by content hash, so unchanged sources are not parsed again",
+    )
+    parser.add_argument(
+        "--cache-size", type=int, default=DEFAULT_MAX_BYTES // (1024 * 1024), metavar="MB",
+        help="evict the oldest --cache-dir entries beyond this size (default: %(default)s)",
+    )
+    add_block_cache_argument(parser)
+    add_compress_arguments(parser)
+    if command == "watch":
+        parser.add_argument("--interval", type=float, default=0.05, help="seconds between polls")
+        parser.add_argument("--debounce", type=float, default=0.02, help="quiet period before rebuilding")
+    else:
+        parser.add_argument(
+            "--shard", type=parse_shard_arg, metavar="I/N",
+            help="build only shard I of N of the pages and static files, writing a partial manifest; "
+            "combine the shards with 'main.py merge'",
+        )
+    args = parser.parse_args(argv)
+    if args.async_io and (args.jobs != 1 or args.profile):
+        parser.error("--async-io cannot be combined with --jobs or --profile")
+    check_compress_level(parser, args)
+    if getattr(args, "shard", None) and args.precompress:
+        parser.error("--precompress cannot be combined with --shard; pass it to 'main.py merge' instead")
+    args.command = command
+    return args
+
+
+def add_template_argument(parser):
+    parser.add_argument(
+        "--template", dest="template_overrides", action="append", default=[], type=parse_template_override,
+        metavar="PATTERN=PATH", help="use the template at PATH for content files matching PATTERN",
+    )
+
+
+def add_block_cache_argument(parser):
+    parser.add_argument(
+        "--block-cache-size", type=int, default=DEFAULT_BLOCK_CACHE_BYTES // (1024 * 1024), metavar="MB",
+        help="memory for rendered blocks reused across pages, per process; 0 disables it (default: %(default)s)",
+    )
+
+
+def add_url_arguments(parser):
+    parser.add_argument(
+        "--relative-urls", action="store_true",
+        help="write root-relative links as paths relative to each page instead of prefixing the basepath",
+    )
+    parser.add_argument(
+        "--asset-map", type=parse_asset_map, metavar="JSON",
+        help="JSON file mapping asset URLs to fingerprinted URLs, applied to links, images and templates",
+    )
+
+
+def add_compress_arguments(parser):
+    parser.add_argument(
+        "--precompress", nargs="?", const=("gz",), type=parse_formats, metavar="FORMATS",
+        help=f"write compressed siblings of text outputs; comma-separated from {', '.join(FORMATS)} (default: gz)",
+    )
+    parser.add_argument(
+        "--compress-min-size", type=int, default=DEFAULT_MIN_SIZE, metavar="BYTES",
+        help="do not precompress files smaller than this (default: %(default)s)",
+    )
+    parser.add_argument("--compress-level", type=int, metavar="N", help="compression level for --precompress")
+
+
+def check_compress_level(parser, args):
+    # Checked here rather than when the first file is compressed, after the
+    # pages are already written.
+    if not args.precompress or args.compress_level is None:
+        return
+    for fmt in args.precompress:
+        try:
+            compressor(fmt, args.compress_level)
+        except ValueError as e:
+            parser.error(f"--compress-level: {e}")
+
+
+def parse_template_override(value):
+    pattern, sep, path = value.partition("=")
+    if not sep or not pattern or not path:
+        raise argparse.ArgumentTypeError(f"expected PATTERN=PATH, got {value!r}")
+    return pattern, path
+
+
+def parse_shard_arg(value):
+    try:
+        return parse_shard(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def parse_asset_map(value):
+    try:
+        return load_asset_map(value)
+    except (OSError, ValueError) as e:
+        raise argparse.ArgumentTypeError(f"cannot load asset map {value}: {e}")
+
+
+def parse_formats(value):
+    formats = tuple(fmt.strip() for fmt in value.split(",") if fmt.strip())
+    unknown = [fmt for fmt in formats if fmt not in FORMATS]
+    if unknown or not formats:
+        raise argparse.ArgumentTypeError(f"expected formats from {', '.join(FORMATS)}, got {value!r}")
+    for fmt in formats:
+        try:
+            compressor(fmt)
+        except ValueError as e:
+            raise argparse.ArgumentTypeError(str(e))
+    return formats
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+    if args.command != "merge":
+        block_cache.resize(args.block_cache_size * 1024 * 1024)
+    if args.command == "watch":
+        watch(args)
+        return
+    if args.command == "serve":
+        serve(args)
+        return
+    if args.command == "merge":
+        if not merge(args):
+            sys.exit(1)
+        return
+
+    if args.shard:
+        manifest = load_shard_manifest(manifest_path, args.shard, content_dir_path)
+    else:
+        manifest = BuildManifest.load(manifest_path)
+    errors = build(args, manifest)
+    if errors:
+        sys.exit(1)
+
+
+def build(args, manifest):
+    profiler = Profiler() if args.profile else NULL_PROFILER
+    stats = BuildStats()
+    parse_cache = open_parse_cache(args)
+    shard = getattr(args, "shard", None)
+    with profiler.stage("static_copy"):
+        files = shard_files(list_files(static_dir_path), shard) if shard else None
+        sync_directory(
+            static_dir_path, public_dir_path, manifest.assets, args.checksum, args.hardlink, open_png_optimizer(args),
+            files,
+        )
+    if args.async_io:
+        from async_build import generate_pages_recursive_async
+
+        errors = generate_pages_recursive_async(
+            content_dir_path, template_path, public_dir_path, args.basepath, manifest, args.template_overrides,
+            stats, parse_cache, args.io_workers, args.max_pending, shard, url_resolver(args),
+        )
+    else:
+        errors = generate_pages_recursive(
+            content_dir_path, template_path, public_dir_path, args.basepath, manifest,
+            resolve_jobs(args.jobs), args.template_overrides, profiler, stats, parse_cache, shard,
+            url_resolver(args),
+        )
+    manifest.remove_stale()
+    manifest.save()
+    if parse_cache is not None:
+        parse_cache.prune()
+    if args.precompress:
+        with profiler.stage("compress"):
+            precompress(args, stats, manifest.assets)
+    report_errors(errors)
+    report_stats(stats)
+    if profiler.enabled:
+        profiler.stop()
+        print(profiler.summary(args.slowest))
+        profiler.write_trace(args.profile)
+        print(f"Wrote Chrome trace to {args.profile}")
+    return errors
+
+
+def merge(args):
+    paths = args.manifests or find_shard_manifests(manifest_path)
+    try:
+        merged = merge_shards(paths, manifest_path)
+    except ShardConflict as e:
+        print(f"Cannot merge shard manifests:\n{e}")
+        return False
+    print(f"Merged {len(paths)} shard(s): {len(merged.pages)} pages, {len(merged.assets)} static files")
+    stats = BuildStats()
+    precompress(args, stats, merged.assets)
+    report_stats(stats)
+    return True
+
+
+def precompress(args, stats, assets):
+    if not args.precompress:
+        return
+    written, skipped, _ = precompress_directory(
+        public_dir_path, args.precompress, args.compress_min_size, args.compress_level, assets=assets
+    )
+    stats.add("compressed_written", len(written))
+    stats.add("compressed_skipped", len(skipped))
+
+
+def url_resolver(args):
+    if args.relative_urls:
+        return RelativeResolver(args.asset_map)
+    return BasepathResolver(args.basepath, args.asset_map)
+
+
+def open_png_optimizer(args):
+    if not args.optimize_png:
+        return None
+    from png import PngOptimizer
+
+    return PngOptimizer(args.cache_dir or asset_cache_path)
+
+
+def open_parse_cache(args):
+    if not args.cache_dir:
+        return None
+    return ParseCache(args.cache_dir, args.cache_size * 1024 * 1024)
+
+
+def report_stats(stats):
+    report = stats.report()
+    if report:
+        print(report)
+
+
+def report_errors(errors):
+    if errors:
+        print(f"{len(errors)} page(s) failed to generate:")
+        for from_path, error in errors:
+            print(f"  {from_path}: {error}")
+
+
+def watch(args):
+    from watch import Watcher, classify_changes
+
+    manifest = BuildManifest.load(manifest_path)
+    build(args, manifest)
+    template_paths = watched_templates(args)
+    watcher = Watcher([content_dir_path, static_dir_path, *template_paths], args.interval, args.debounce)
+    print(f"Watching {content_dir_path}, {static_dir_path} and {template_path} for changes (Ctrl+C to stop)")
+    try:
+        while True:
+            changes = watcher.wait_for_changes()
+            start = time.perf_counter()
+            changeset = classify_changes(changes, content_dir_path, static_dir_path, template_paths)
+            rebuilt = try_rebuild(args, manifest, changeset)
+            if changeset.template_changed:
+                template_paths = watched_templates(args)
+                watcher.paths = [content_dir_path, static_dir_path, *template_paths]
+            if rebuilt:
+                print(f"Rebuilt in {(time.perf_counter() - start) * 1000:.1f} ms")
+    except KeyboardInterrupt:
+        pass
+
+
+def serve(args):
+    from dev_server import DevServer, run_server
+
+    site = DevServer(
+        content_dir_path, static_dir_path, template_path, args.basepath, args.template_overrides,
+        resolver=url_resolver(args),
+    )
+    host = "localhost" if args.bind in ("", "0.0.0.0") else args.bind
+    print(f"Serving {content_dir_path} and {static_dir_path} at http://{host}:{args.port}{site.prefix} (Ctrl+C to stop)")
+    try:
+        run_server(site, args.bind, args.port)
+    except KeyboardInterrupt:
+        pass
+
+
+def watched_templates(args):
+    paths = [template_path] + [path for _, path in args.template_overrides]
+    dependencies = set()
+    for path in paths:
+        try:
+            dependencies.update(load_template(path, args.basepath).dependencies)
+        except (OSError, ValueError) as e:
+            print(f"Cannot load template {path}: {e}")
+            dependencies.add(os.path.abspath(path))
+    return sorted(dependencies)
+
+
+def try_rebuild(args, manifest, changeset):
+    # A half-saved template or partial must not stop the watcher; the next
+    # save triggers another rebuild.
+    try:
+        rebuild(args, manifest, changeset)
+    except (OSError, ValueError) as e:
+        print(f"Rebuild failed, waiting for the next change: {type(e).__name__}: {e}")
+        return False
+    return True
+
+
+def rebuild(args, manifest, changeset):
+    stats = BuildStats()
+    if changeset.template_changed:
+        errors = generate_pages_recursive(
+            content_dir_path, template_path, public_dir_path, args.basepath, manifest,
+            resolve_jobs(args.jobs), args.template_overrides, stats=stats, parse_cache=open_parse_cache(args),
+            resolver=url_resolver(args),
+        )
+    else:
+        pages = [
+            (os.path.join(content_dir_path, rel_path), page_dest_path(rel_path, public_dir_path))
+            for rel_path in changeset.pages
+        ]
+        errors = generate_pages(
+            pages, content_dir_path, template_path, args.basepath, manifest, 1, args.template_overrides,
+            stats=stats, parse_cache=open_parse_cache(args), resolver=url_resolver(args),
+        )
+    for rel_path in changeset.deleted_pages:
+        manifest.remove(os.path.join(content_dir_path, rel_path))
+    for rel_path in changeset.assets:
+        sync_file(
+            static_dir_path, public_dir_path, rel_path, manifest.assets, args.checksum, args.hardlink,
+            open_png_optimizer(args),
+        )
+    for rel_path in changeset.deleted_assets:
+        remove_synced_file(public_dir_path, rel_path, manifest.assets)
+    manifest.save()
+    precompress(args, stats, manifest.assets)
+    report_errors(errors)
+    report_stats(stats)
+    return errors
+
+
+if __name__ == "__main__":
+    main()
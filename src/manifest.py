@@ -0,0 +1,89 @@
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 1
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class BuildManifest:
+    def __init__(self, path, pages=None, assets=None, shard=None):
+        self.path = path
+        self.pages = pages if pages is not None else {}
+        self.assets = assets if assets is not None else {}
+        # (index, count) for the partial manifest of a sharded build.
+        self.shard = shard
+        self.seen = set()
+
+    def __repr__(self):
+        return f"BuildManifest({self.path}, {len(self.pages)} pages)"
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            return cls(path)
+        try:
+            with open(path, "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            print(f"Ignoring unreadable build manifest {path}")
+            return cls(path)
+        if data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        shard = tuple(data["shard"]) if data.get("shard") else None
+        return cls(path, data.get("pages", {}), data.get("assets", {}), shard)
+
+    def save(self):
+        data = {"version": MANIFEST_VERSION, "pages": self.pages, "assets": self.assets}
+        if self.shard is not None:
+            data["shard"] = list(self.shard)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(self, from_path, source_hash, template_hash, basepath, dest_path):
+        self.seen.add(from_path)
+        entry = self.pages.get(from_path)
+        if entry is None:
+            return False
+        if (
+            entry["source_hash"] != source_hash
+            or entry["template_hash"] != template_hash
+            or entry["basepath"] != basepath
+            or entry["dest"] != dest_path
+        ):
+            return False
+        if not os.path.isfile(dest_path):
+            return False
+        return file_hash(dest_path) == entry["output_hash"]
+
+    def record(self, from_path, source_hash, template_hash, basepath, dest_path, output_hash):
+        self.seen.add(from_path)
+        self.pages[from_path] = {
+            "source_hash": source_hash,
+            "template_hash": template_hash,
+            "basepath": basepath,
+            "dest": dest_path,
+            "output_hash": output_hash,
+        }
+
+    def remove(self, from_path):
+        entry = self.pages.pop(from_path, None)
+        if entry is None:
+            return None
+        dest_path = entry["dest"]
+        if os.path.isfile(dest_path):
+            os.remove(dest_path)
+            print(f"Removed stale page: {dest_path}")
+        return dest_path
+
+    def remove_stale(self):
+        return [self.remove(from_path) for from_path in sorted(set(self.pages) - self.seen)]
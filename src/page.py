@@ -0,0 +1,107 @@
+from block_cache import RenderedBlock, block_cache, walk_block
+from block_markdown import block_to_html_node, iter_blocks
+from htmlnode import HtmlNode, ParentNode
+from profiling import NULL_PROFILER
+
+
+class Page:
+    def __init__(self, source_path, content, title, headings=None, links=None, images=None, word_count=0):
+        self.source_path = source_path
+        # Either the page's node tree or its already rendered HTML.
+        self.content = content
+        self.title = title
+        self.headings = headings if headings is not None else []
+        self.links = links if links is not None else []
+        self.images = images if images is not None else []
+        self.word_count = word_count
+
+    def __repr__(self):
+        return f"Page({self.source_path}, {self.title!r}, {len(self.headings)} headings, {self.word_count} words)"
+
+    @property
+    def html(self):
+        if isinstance(self.content, HtmlNode):
+            return self.content.to_html()
+        return self.content
+
+    def rendered(self):
+        return Page(
+            self.source_path, self.html, self.title, self.headings, self.links, self.images, self.word_count
+        )
+
+    def to_dict(self):
+        return {
+            "html": self.html,
+            "title": self.title,
+            "headings": self.headings,
+            "links": self.links,
+            "images": self.images,
+            "word_count": self.word_count,
+        }
+
+    @classmethod
+    def from_dict(cls, source_path, data):
+        return cls(
+            source_path,
+            data["html"],
+            data["title"],
+            [tuple(heading) for heading in data["headings"]],
+            data["links"],
+            [tuple(image) for image in data["images"]],
+            data["word_count"],
+        )
+
+
+def compile_page(lines, source_path=None, profiler=NULL_PROFILER, resolver=None):
+    # Builds the node tree, then gathers the title (the first h1),
+    # headings, links, images and word count from it.
+    if profiler.enabled:
+        with profiler.stage("block_parse", source_path):
+            blocks = list(iter_blocks(lines))
+    else:
+        blocks = iter_blocks(lines)
+    if profiler.enabled:
+        children = render_blocks_profiled(blocks, resolver, profiler, source_path)
+    else:
+        children = [block_cache.render(block, resolver) for block in blocks]
+    headings = []
+    links = []
+    images = []
+    word_count = 0
+    for node in children:
+        metadata = block_metadata(node)
+        headings.extend(metadata.headings)
+        links.extend(metadata.links)
+        images.extend(metadata.images)
+        word_count += metadata.word_count
+    title = next((text for level, text in headings if level == 1), None)
+    if title is None:
+        raise ValueError("no title found")
+    return Page(source_path, ParentNode("div", children, None), title, headings, links, images, word_count)
+
+
+def render_blocks_profiled(blocks, resolver, profiler, source_path):
+    # Parsing an uncached block and rendering its HTML are timed as
+    # separate stages, so the cache cannot do both in one render() call.
+    parsed = []
+    with profiler.stage("inline_parse", source_path):
+        for block in blocks:
+            rendered = block_cache.lookup(block, resolver)
+            if rendered is not None:
+                parsed.append((block, rendered, None))
+            else:
+                node = block_to_html_node(block, resolver)
+                parsed.append((block, node, walk_block(node)))
+    with profiler.stage("render", source_path):
+        return [
+            node if metadata is None else block_cache.store(block, node, resolver, metadata)
+            for block, node, metadata in parsed
+        ]
+
+
+def block_metadata(node):
+    # Cached blocks are shared between pages, so their metadata is
+    # computed once and kept alongside the rendered HTML.
+    if isinstance(node, RenderedBlock):
+        return node.metadata
+    return walk_block(node)
@@ -0,0 +1,96 @@
+import hashlib
+import json
+import os
+import re
+
+# Bump whenever the rendered HTML for the same markdown can change, so
+# caches restored from older builds are never read.
+PARSE_CACHE_VERSION = 3
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+# The cache directory may be shared with other tools (--cache-dir . or a
+# CI cache root), so only directories named like this belong to us.
+VERSION_DIR_PATTERN = re.compile(r"parse-v\d+")
+
+
+class ParseCache:
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.version_dir = os.path.join(directory, f"parse-v{PARSE_CACHE_VERSION}")
+
+    def __repr__(self):
+        return f"ParseCache({self.version_dir}, max_bytes={self.max_bytes})"
+
+    def key(self, data, resolver=None):
+        h = hashlib.sha256()
+        if resolver is not None:
+            # The cached HTML has its URLs resolved already.
+            h.update(resolver.key.encode() + b"\0")
+        h.update(data)
+        return h.hexdigest()
+
+    def path_for(self, key):
+        return os.path.join(self.version_dir, key[:2], key + ".json")
+
+    def get(self, key):
+        path = self.path_for(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(entry, dict) or entry.get("key") != key:
+            return None
+        return entry
+
+    def put(self, key, entry):
+        import tempfile
+
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Several workers may render the same content at once; each writes
+        # its own temp file and the last os.replace wins with identical data.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({**entry, "key": key}, f)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def prune(self):
+        import shutil
+
+        if not os.path.isdir(self.directory):
+            return []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if path != self.version_dir and VERSION_DIR_PATTERN.fullmatch(name) and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+        entries = []
+        total = 0
+        for dirpath, _, filenames in os.walk(self.version_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                entries.append((st.st_mtime_ns, st.st_size, path))
+                total += st.st_size
+
+        removed = []
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed.append(path)
+        return removed
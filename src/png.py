@@ -0,0 +1,294 @@
+import hashlib
+import os
+import struct
+import zlib
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_CACHE_VERSION = 2
+
+# Critical chunks plus the ancillary chunks that change how pixels are
+# displayed. Everything else (text, EXIF, timestamps, physical size, ...)
+# is dropped.
+KEPT_CHUNKS = {b"IHDR", b"PLTE", b"tRNS", b"cHRM", b"gAMA", b"iCCP", b"sBIT", b"sRGB", b"IEND"}
+CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+
+# Maps each filtered byte to its distance from zero as a signed byte, so
+# the sum over a row is the usual "minimum sum of absolute differences"
+# heuristic for picking a filter.
+ABS_TABLE = bytes(min(b, 256 - b) for b in range(256))
+
+
+class PngError(ValueError):
+    pass
+
+
+def read_chunks(data):
+    if not data.startswith(PNG_SIGNATURE):
+        raise PngError("not a PNG file")
+    chunks = []
+    pos = len(PNG_SIGNATURE)
+    while pos < len(data):
+        if pos + 8 > len(data):
+            raise PngError("truncated chunk header")
+        length, chunk_type = struct.unpack(">I4s", data[pos:pos + 8])
+        body = data[pos + 8:pos + 8 + length]
+        crc = data[pos + 8 + length:pos + 12 + length]
+        if len(body) != length or len(crc) != 4:
+            raise PngError(f"truncated {chunk_type!r} chunk")
+        if struct.unpack(">I", crc)[0] != zlib.crc32(chunk_type + body):
+            raise PngError(f"bad CRC in {chunk_type!r} chunk")
+        chunks.append((chunk_type, body))
+        pos += 12 + length
+        if chunk_type == b"IEND":
+            break
+    if not chunks or chunks[0][0] != b"IHDR" or chunks[-1][0] != b"IEND":
+        raise PngError("missing IHDR or IEND")
+    return chunks
+
+
+def write_chunk(chunk_type, body):
+    return struct.pack(">I", len(body)) + chunk_type + body + struct.pack(">I", zlib.crc32(chunk_type + body))
+
+
+def optimize_png(data):
+    # Returns a losslessly re-encoded copy of data, or data itself when
+    # the image is interlaced or animated or nothing smaller can be
+    # produced. Only the default image is re-encoded, so an APNG's other
+    # frames would be lost.
+    chunks = read_chunks(data)
+    if any(chunk_type == b"acTL" for chunk_type, _ in chunks):
+        return data
+    width, height, bit_depth, color_type, _, _, interlace = struct.unpack(">IIBBBBB", chunks[0][1])
+    if color_type not in CHANNELS:
+        raise PngError(f"invalid color type {color_type}")
+    if interlace:
+        return data
+
+    bits_per_pixel = CHANNELS[color_type] * bit_depth
+    bpp = max(1, bits_per_pixel // 8)
+    row_bytes = (width * bits_per_pixel + 7) // 8
+    raw = zlib.decompress(b"".join(body for chunk_type, body in chunks if chunk_type == b"IDAT"))
+    rows = unfilter(raw, height, row_bytes, bpp)
+
+    candidates = [b"".join(b"\x00" + row for row in rows), filter_rows(rows, bpp)]
+    idat = min(
+        (compress(candidate, strategy) for candidate in candidates for strategy in (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED)),
+        key=len,
+    )
+
+    out = [PNG_SIGNATURE]
+    for chunk_type, body in chunks:
+        if chunk_type == b"IDAT":
+            if idat is not None:
+                out.append(write_chunk(b"IDAT", idat))
+                idat = None
+        elif chunk_type in KEPT_CHUNKS:
+            out.append(write_chunk(chunk_type, body))
+    optimized = b"".join(out)
+    return optimized if len(optimized) < len(data) else data
+
+
+def compress(data, strategy):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+    return compressor.compress(data) + compressor.flush()
+
+
+def unfilter(raw, height, row_bytes, bpp):
+    if len(raw) < height * (row_bytes + 1):
+        raise PngError("image data is truncated")
+    masks = SwarMasks(row_bytes)
+    shift = 8 * bpp
+    rows = []
+    prior = 0
+    prior_row = bytes(row_bytes)
+    for y in range(height):
+        start = y * (row_bytes + 1)
+        filter_type = raw[start]
+        line = raw[start + 1:start + 1 + row_bytes]
+        if filter_type == 0:
+            row = line
+        elif filter_type == 1:
+            row = to_bytes(masks.prefix_sum(from_bytes(line), shift), row_bytes)
+        elif filter_type == 2:
+            row = to_bytes(masks.add(from_bytes(line), prior), row_bytes)
+        elif filter_type == 3:
+            row = unfilter_average(line, prior_row, bpp)
+        elif filter_type == 4:
+            row = unfilter_paeth(line, prior_row, bpp)
+        else:
+            raise PngError(f"invalid filter type {filter_type}")
+        rows.append(row)
+        prior_row = row
+        prior = from_bytes(row)
+    return rows
+
+
+def unfilter_average(line, prior_row, bpp):
+    row = bytearray(line)
+    for i in range(bpp):
+        row[i] = (row[i] + (prior_row[i] >> 1)) & 0xFF
+    for i in range(bpp, len(row)):
+        row[i] = (row[i] + ((row[i - bpp] + prior_row[i]) >> 1)) & 0xFF
+    return bytes(row)
+
+
+def unfilter_paeth(line, prior_row, bpp):
+    row = bytearray(line)
+    for i in range(bpp):
+        row[i] = (row[i] + prior_row[i]) & 0xFF
+    for i in range(bpp, len(row)):
+        a = row[i - bpp]
+        b = prior_row[i]
+        c = prior_row[i - bpp]
+        pa = abs(b - c)
+        pb = abs(a - c)
+        pc = abs(a + b - c - c)
+        if pa <= pb and pa <= pc:
+            row[i] = (row[i] + a) & 0xFF
+        elif pb <= pc:
+            row[i] = (row[i] + b) & 0xFF
+        else:
+            row[i] = (row[i] + c) & 0xFF
+    return bytes(row)
+
+
+def paeth_filter(row, prior_row, bpp):
+    out = bytearray(row)
+    for i in range(bpp):
+        out[i] = (row[i] - prior_row[i]) & 0xFF
+    for i in range(bpp, len(row)):
+        a = row[i - bpp]
+        b = prior_row[i]
+        c = prior_row[i - bpp]
+        pa = abs(b - c)
+        pb = abs(a - c)
+        pc = abs(a + b - c - c)
+        if pa <= pb and pa <= pc:
+            out[i] = (row[i] - a) & 0xFF
+        elif pb <= pc:
+            out[i] = (row[i] - b) & 0xFF
+        else:
+            out[i] = (row[i] - c) & 0xFF
+    return bytes(out)
+
+
+def filter_rows(rows, bpp):
+    # Picks the filter with the smallest sum of absolute values per row.
+    # None, Sub, Up and Average are computed for the whole row at once
+    # with SWAR arithmetic on big integers; Paeth needs a byte loop and is
+    # only tried when the cheap filters leave a noisy row.
+    if not rows:
+        return b""
+    row_bytes = len(rows[0])
+    masks = SwarMasks(row_bytes)
+    shift = 8 * bpp
+    out = []
+    prior = 0
+    prior_row = bytes(row_bytes)
+    for row in rows:
+        x = from_bytes(row)
+        left = x >> shift
+        options = [
+            (b"\x00", row),
+            (b"\x01", to_bytes(masks.sub(x, left), row_bytes)),
+            (b"\x02", to_bytes(masks.sub(x, prior), row_bytes)),
+            (b"\x03", to_bytes(masks.sub(x, masks.average(left, prior)), row_bytes)),
+        ]
+        best = min(options, key=lambda option: sum(option[1].translate(ABS_TABLE)))
+        best_score = sum(best[1].translate(ABS_TABLE))
+        if best_score > 8 * row_bytes:
+            paeth = paeth_filter(row, prior_row, bpp)
+            if sum(paeth.translate(ABS_TABLE)) < best_score:
+                best = (b"\x04", paeth)
+        out.append(best[0])
+        out.append(best[1])
+        prior = x
+        prior_row = row
+    return b"".join(out)
+
+
+def from_bytes(data):
+    return int.from_bytes(data, "big")
+
+
+def to_bytes(value, length):
+    return value.to_bytes(length, "big")
+
+
+class SwarMasks:
+    # Byte-wise arithmetic modulo 256 on whole scanlines packed into one
+    # big-endian integer, so "the byte bpp positions to the left" is a
+    # right shift by 8 * bpp bits.
+    def __init__(self, length):
+        self.low = int.from_bytes(b"\x7f" * length, "big")
+        self.high = int.from_bytes(b"\x80" * length, "big")
+        self.no_low_bit = int.from_bytes(b"\xfe" * length, "big")
+
+    def add(self, x, y):
+        return ((x & self.low) + (y & self.low)) ^ ((x ^ y) & self.high)
+
+    def sub(self, x, y):
+        return ((x | self.high) - (y & self.low)) ^ ((x ^ ~y) & self.high)
+
+    def average(self, x, y):
+        return (x & y) + (((x ^ y) & self.no_low_bit) >> 1)
+
+    def prefix_sum(self, x, shift):
+        # Undoes the Sub filter: a running sum of bytes bpp apart, done in
+        # log2(width) doubling steps.
+        length = self.low.bit_length()
+        while shift < length:
+            x = self.add(x, x >> shift)
+            shift *= 2
+        return x
+
+
+class PngOptimizer:
+    def __init__(self, cache_dir=None):
+        self.cache_dir = os.path.join(cache_dir, f"png-v{PNG_CACHE_VERSION}") if cache_dir else None
+        self.memory = {}
+
+    def __repr__(self):
+        return f"PngOptimizer({self.cache_dir})"
+
+    def optimize_file(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        key = hashlib.sha256(data).hexdigest()
+        optimized = self.memory.get(key)
+        if optimized is None:
+            optimized = self._load(key)
+        if optimized is None:
+            try:
+                optimized = optimize_png(data)
+            except (PngError, zlib.error) as e:
+                print(f"Cannot optimize {path}: {e}")
+                optimized = data
+            self._store(key, optimized)
+        self.memory[key] = optimized
+        return optimized
+
+    def _cache_path(self, key):
+        return os.path.join(self.cache_dir, key[:2], key + ".png")
+
+    def _load(self, key):
+        if self.cache_dir is None:
+            return None
+        try:
+            with open(self._cache_path(key), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _store(self, key, optimized):
+        if self.cache_dir is None:
+            return
+        path = self._cache_path(key)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(optimized)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"Cannot write PNG cache entry {path}: {e}")
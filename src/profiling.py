@@ -0,0 +1,110 @@
+import contextlib
+import json
+import os
+import time
+
+
+class NullProfiler:
+    enabled = False
+
+    def stage(self, name, page=None):
+        return contextlib.nullcontext()
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class Profiler:
+    enabled = True
+
+    def __init__(self, track_allocations=True):
+        self.events = []
+        self.track_allocations = track_allocations
+        if track_allocations:
+            import tracemalloc
+
+            self._tracemalloc = tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+
+    def __repr__(self):
+        return f"Profiler({len(self.events)} events)"
+
+    @contextlib.contextmanager
+    def stage(self, name, page=None):
+        if self.track_allocations:
+            self._tracemalloc.reset_peak()
+            mem_start = self._tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter_ns() - start
+            alloc = self._tracemalloc.get_traced_memory()[1] - mem_start if self.track_allocations else 0
+            self.events.append({
+                "stage": name,
+                "page": page,
+                "start_ns": start,
+                "duration_ns": duration,
+                "alloc_bytes": alloc,
+                "pid": os.getpid(),
+            })
+
+    def stop(self):
+        if self.track_allocations and self._tracemalloc.is_tracing():
+            self._tracemalloc.stop()
+
+    def stage_totals(self):
+        totals = {}
+        for event in self.events:
+            entry = totals.setdefault(event["stage"], {"count": 0, "duration_ns": 0, "alloc_bytes": 0})
+            entry["count"] += 1
+            entry["duration_ns"] += event["duration_ns"]
+            entry["alloc_bytes"] += event["alloc_bytes"]
+        return totals
+
+    def slowest_pages(self, n=10):
+        pages = {}
+        for event in self.events:
+            if event["page"] is not None:
+                pages[event["page"]] = pages.get(event["page"], 0) + event["duration_ns"]
+        return sorted(pages.items(), key=lambda item: item[1], reverse=True)[:n]
+
+    def summary(self, slowest=10):
+        totals = self.stage_totals()
+        total_ns = sum(entry["duration_ns"] for entry in totals.values()) or 1
+        lines = [f"{'stage':<16}{'count':>8}{'total ms':>12}{'mean ms':>10}{'share':>8}{'alloc MB':>11}"]
+        for name, entry in sorted(totals.items(), key=lambda item: item[1]["duration_ns"], reverse=True):
+            lines.append(
+                f"{name:<16}{entry['count']:>8}{entry['duration_ns'] / 1e6:>12.2f}"
+                f"{entry['duration_ns'] / entry['count'] / 1e6:>10.3f}"
+                f"{entry['duration_ns'] / total_ns:>8.1%}{entry['alloc_bytes'] / 1e6:>11.2f}"
+            )
+        if slowest:
+            lines.append("")
+            lines.append(f"Slowest {slowest} pages:")
+            for page, duration in self.slowest_pages(slowest):
+                lines.append(f"{duration / 1e6:>10.2f} ms  {page}")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        trace_events = []
+        for event in self.events:
+            args = {"alloc_bytes": event["alloc_bytes"]}
+            if event["page"] is not None:
+                args["page"] = event["page"]
+            trace_events.append({
+                "name": event["stage"],
+                "cat": "build",
+                "ph": "X",
+                "ts": event["start_ns"] / 1000,
+                "dur": event["duration_ns"] / 1000,
+                "pid": event["pid"],
+                "tid": event["pid"],
+                "args": args,
+            })
+        return {"traceEvents": trace_events, "displayTimeUnit": "ms"}
+
+    def write_trace(self, path):
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
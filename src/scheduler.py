@@ -0,0 +1,29 @@
+import functools
+import os
+
+
+def resolve_jobs(jobs):
+    if jobs is None or jobs < 1:
+        return os.cpu_count() or 1
+    return jobs
+
+
+def map_ordered(func, items, jobs=1):
+    items = list(items)
+    worker = functools.partial(_call_safely, func)
+    if jobs <= 1 or len(items) <= 1:
+        yield from map(worker, items)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    chunksize = max(1, len(items) // (jobs * 4))
+    with ProcessPoolExecutor(max_workers=min(jobs, len(items))) as pool:
+        yield from pool.map(worker, items, chunksize=chunksize)
+
+
+def _call_safely(func, item):
+    try:
+        return func(item), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
@@ -0,0 +1,133 @@
+import glob
+import hashlib
+import os
+
+from manifest import BuildManifest, file_hash
+
+
+class ShardConflict(ValueError):
+    pass
+
+
+def parse_shard(value):
+    index, sep, count = value.partition("/")
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        index = count = None
+    if not sep or count is None or count < 1 or not 0 <= index < count:
+        raise ValueError(f"expected a shard as INDEX/COUNT with 0 <= INDEX < COUNT, got {value!r}")
+    return index, count
+
+
+def shard_of(rel_path, count):
+    # A stable hash of the "/"-separated relative path, so every machine
+    # and every Python process agrees on the partition.
+    key = rel_path.replace(os.sep, "/").encode()
+    return int.from_bytes(hashlib.sha256(key).digest()[:8], "big") % count
+
+
+def in_shard(rel_path, shard):
+    if shard is None:
+        return True
+    index, count = shard
+    return shard_of(rel_path, count) == index
+
+
+def shard_pages(pages, dir_path_content, shard):
+    if shard is None:
+        return pages
+    return [
+        (from_path, dest_path) for from_path, dest_path in pages
+        if in_shard(os.path.relpath(from_path, dir_path_content), shard)
+    ]
+
+
+def shard_files(rel_paths, shard):
+    return [rel_path for rel_path in rel_paths if in_shard(rel_path, shard)]
+
+
+def shard_manifest_path(manifest_path, shard):
+    root, ext = os.path.splitext(manifest_path)
+    return f"{root}.shard-{shard[0]}-of-{shard[1]}{ext}"
+
+
+def load_shard_manifest(manifest_path, shard, dir_path_content):
+    # An existing partial manifest for this shard wins; otherwise the
+    # shard starts from its slice of a previous full build so it stays
+    # incremental.
+    path = shard_manifest_path(manifest_path, shard)
+    if os.path.exists(path):
+        manifest = BuildManifest.load(path)
+        if manifest.shard == shard:
+            return manifest
+    full = BuildManifest.load(manifest_path)
+    pages = {
+        from_path: entry for from_path, entry in full.pages.items()
+        if in_shard(os.path.relpath(from_path, dir_path_content), shard)
+    }
+    assets = {rel_path: record for rel_path, record in full.assets.items() if in_shard(rel_path, shard)}
+    return BuildManifest(path, pages, assets, shard)
+
+
+def find_shard_manifests(manifest_path):
+    root, ext = os.path.splitext(manifest_path)
+    return sorted(glob.glob(f"{glob.escape(root)}.shard-*-of-*{ext}"))
+
+
+def merge_shards(paths, manifest_path):
+    # Combines partial manifests into one full manifest at manifest_path.
+    # Raises ShardConflict, listing every problem found, if the shards do
+    # not form one complete, disjoint build whose outputs are on disk.
+    if not paths:
+        raise ShardConflict("no shard manifests to merge")
+    manifests = [BuildManifest.load(path) for path in paths]
+    problems = []
+
+    shards = {}
+    for path, manifest in zip(paths, manifests):
+        if manifest.shard is None:
+            problems.append(f"{path} is not a shard manifest")
+        elif manifest.shard in shards:
+            problems.append(f"{path} and {shards[manifest.shard]} are both shard {manifest.shard[0]}/{manifest.shard[1]}")
+        else:
+            shards[manifest.shard] = path
+    counts = {count for _, count in shards}
+    if len(counts) > 1:
+        problems.append(f"shard manifests disagree on the shard count: {sorted(counts)}")
+    elif counts:
+        count = counts.pop()
+        missing = sorted(set(range(count)) - {index for index, _ in shards})
+        if missing:
+            problems.append(f"missing shards {', '.join(f'{index}/{count}' for index in missing)}")
+
+    merged = BuildManifest(manifest_path)
+    page_owner = {}
+    dest_owner = {}
+    asset_owner = {}
+    for path, manifest in zip(paths, manifests):
+        for from_path, entry in manifest.pages.items():
+            if from_path in page_owner:
+                problems.append(f"page {from_path} was built by both {page_owner[from_path]} and {path}")
+                continue
+            if entry["dest"] in dest_owner:
+                problems.append(f"output {entry['dest']} was written by both {dest_owner[entry['dest']]} and {path}")
+                continue
+            page_owner[from_path] = path
+            dest_owner[entry["dest"]] = path
+            if not os.path.isfile(entry["dest"]) or file_hash(entry["dest"]) != entry["output_hash"]:
+                problems.append(f"output {entry['dest']} from {path} is missing or does not match its manifest")
+            merged.pages[from_path] = entry
+        for rel_path, record in manifest.assets.items():
+            if rel_path in asset_owner:
+                problems.append(f"asset {rel_path} was synced by both {asset_owner[rel_path]} and {path}")
+                continue
+            asset_owner[rel_path] = path
+            merged.assets[rel_path] = record
+
+    if problems:
+        raise ShardConflict("\n".join(problems))
+    merged.save()
+    for path in paths:
+        os.remove(path)
+    return merged
@@ -0,0 +1,106 @@
+import fnmatch
+import io
+import os
+
+from generate_page import fill_template, write_page
+from page import compile_page
+from template import Template
+from urls import as_resolver
+
+
+class MemorySink:
+    def __init__(self):
+        self.outputs = {}
+
+    def __repr__(self):
+        return f"MemorySink({len(self.outputs)} outputs)"
+
+    def write(self, path, html):
+        self.outputs[path] = html
+
+
+class DirectorySink:
+    def __init__(self, root):
+        self.root = root
+
+    def __repr__(self):
+        return f"DirectorySink({self.root})"
+
+    def write(self, path, html):
+        write_page(os.path.join(self.root, *path.split("/")), html)
+
+
+class Site:
+    # A site held entirely in memory: sources maps "/"-separated paths such
+    # as "blog/post/index.md" to markdown text, and templates are strings.
+    # Nothing touches the filesystem unless the sink does.
+    def __init__(self, sources, template, basepath="/", partials=None, template_overrides=None, resolver=None):
+        self.sources = dict(sources)
+        self.basepath = basepath
+        self.resolver = as_resolver(basepath if resolver is None else resolver)
+        self.template_text = template
+        self.template_overrides = list(template_overrides or [])
+        self.partials = partials
+        self.templates = {}
+        # Compiling up front reports template errors before any page.
+        for text in [template] + [text for _, text in self.template_overrides]:
+            self.compiled(text, self.resolver)
+
+    def __repr__(self):
+        return f"Site({len(self.sources)} sources, basepath={self.basepath!r})"
+
+    def output_path(self, source_path):
+        return source_path.replace(".md", ".html")
+
+    def resolver_for(self, source_path):
+        if self.resolver is None:
+            return None
+        return self.resolver.for_page(source_path)
+
+    def template_for(self, source_path):
+        text = next(
+            (text for pattern, text in self.template_overrides if fnmatch.fnmatch(source_path, pattern)),
+            self.template_text,
+        )
+        return self.compiled(text, self.resolver_for(source_path))
+
+    def compiled(self, text, resolver):
+        # Templates are compiled once per resolver, which for relative URLs
+        # means once per directory.
+        key = (text, None if resolver is None else resolver.key)
+        template = self.templates.get(key)
+        if template is None:
+            template = self.templates[key] = Template.from_string(text, resolver, self.partials)
+        return template
+
+    def compile(self, source_path):
+        # StringIO with newline=None reads the text the way open() would
+        # read the same file, so output matches a build from disk.
+        return compile_page(
+            io.StringIO(self.sources[source_path], newline=None), source_path, resolver=self.resolver_for(source_path)
+        )
+
+    def render(self, source_path):
+        page = self.compile(source_path)
+        return "".join(fill_template(self.template_for(source_path), page.title, page.content))
+
+    def build(self, sink):
+        errors = []
+        for source_path in sorted(self.sources):
+            try:
+                html = self.render(source_path)
+            except ValueError as e:
+                errors.append((source_path, f"{type(e).__name__}: {e}"))
+                continue
+            sink.write(self.output_path(source_path), html)
+        return errors
+
+
+def build(sources, template, basepath="/", sink=None, partials=None, template_overrides=None, resolver=None):
+    # Renders every source and hands each page to sink.write(path, html).
+    # Returns (sink, errors); the default MemorySink keeps the pages in
+    # its outputs dict.
+    if sink is None:
+        sink = MemorySink()
+    errors = Site(sources, template, basepath, partials, template_overrides, resolver).build(sink)
+    return sink, errors
@@ -0,0 +1,37 @@
+class BuildStats:
+    def __init__(self):
+        self.counters = {}
+
+    def __repr__(self):
+        return f"BuildStats({self.counters})"
+
+    def __getitem__(self, name):
+        return self.counters.get(name, 0)
+
+    def add(self, name, count=1):
+        self.counters[name] = self.counters.get(name, 0) + count
+
+    def merge(self, counters):
+        for name, count in counters.items():
+            self.add(name, count)
+
+    def report(self):
+        lines = []
+        if self["pages_written"] or self["pages_identical"] or self["pages_fresh"]:
+            lines.append(
+                f"Pages: {self['pages_written']} written, {self['pages_identical']} identical (not rewritten), "
+                f"{self['pages_fresh']} up to date"
+            )
+        if self["compressed_written"] or self["compressed_skipped"]:
+            lines.append(
+                f"Compressed: {self['compressed_written']} written, {self['compressed_skipped']} up to date"
+            )
+        for label, name in (("Block cache", "block_cache"), ("Parse cache", "parse_cache")):
+            hits, misses = self[f"{name}_hits"], self[f"{name}_misses"]
+            if hits or misses:
+                lines.append(f"{label}: {hits} hits, {misses} misses ({hits / (hits + misses):.1%} hit rate)")
+        return "\n".join(lines)
+
+
+def counter_delta(after, before):
+    return {name: count - before.get(name, 0) for name, count in after.items()}
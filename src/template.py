@@ -0,0 +1,208 @@
+import fnmatch
+import hashlib
+import os
+import re
+
+from urls import as_resolver
+
+SLOT_PATTERN = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+DIRECTIVE_PATTERN = re.compile(r"\{\{([<>])\s*([^\s{}]+)\s*\}\}")
+URL_ATTRIBUTE_PATTERN = re.compile(r'\b((?:href|src)=")([^"]*)"')
+
+_cache = {}
+
+
+class Template:
+    def __init__(self, pieces, slots, dependencies=None, resolver=None):
+        self.pieces = pieces
+        self.slots = slots
+        self.slot_names = dict(slots)
+        self.dependencies = dependencies or []
+        self.resolver = resolver
+        self.digest = _digest(self.dependencies) if self.dependencies else _digest_text("".join(pieces))
+        if resolver is not None:
+            # Pages built with another resolver are not up to date.
+            self.digest = _digest_text(f"{self.digest}:{resolver.key}")
+
+    def __repr__(self):
+        return f"Template({len(self.pieces)} pieces, slots={[name for _, name in self.slots]})"
+
+    @classmethod
+    def from_string(cls, text, resolver=None, partials=None):
+        # resolver is a UrlResolver or a basepath; it is applied to the
+        # href and src attributes written in the template itself.
+        parts = _parse(text, partials or {}, [])
+        return cls._from_parts(parts, as_resolver(resolver))
+
+    @classmethod
+    def from_file(cls, path, resolver=None):
+        dependencies = []
+        parts = _parse_file(path, dependencies, [])
+        return cls._from_parts(parts, as_resolver(resolver), dependencies)
+
+    @classmethod
+    def _from_parts(cls, parts, resolver, dependencies=None):
+        pieces = []
+        slots = []
+        for part in parts:
+            if isinstance(part, tuple):
+                slots.append((len(pieces), part[0]))
+                pieces.append(part[1])
+            elif pieces and not _is_slot(slots, len(pieces) - 1):
+                pieces[-1] += part
+            else:
+                pieces.append(part)
+        if resolver is not None:
+            slot_positions = {i for i, _ in slots}
+            for i, piece in enumerate(pieces):
+                if i not in slot_positions:
+                    pieces[i] = resolve_urls(piece, resolver)
+        return cls(pieces, slots, dependencies, resolver)
+
+    def render(self, **values):
+        pieces = list(self.pieces)
+        for i, name in self.slots:
+            if name in values:
+                pieces[i] = values[name]
+        return "".join(pieces)
+
+    def iter_render(self, **values):
+        for i, piece in enumerate(self.pieces):
+            name = self.slot_names.get(i)
+            if name is None or name not in values:
+                yield piece
+            elif isinstance(values[name], str):
+                yield values[name]
+            else:
+                yield from values[name]
+
+
+class TemplateLoader:
+    def __init__(self, default_path, overrides=None, resolver=None):
+        self.default_path = default_path
+        self.overrides = list(overrides or [])
+        self.resolver = as_resolver(resolver)
+
+    def path_for(self, rel_path):
+        rel_path = rel_path.replace(os.sep, "/")
+        for pattern, template_path in self.overrides:
+            if fnmatch.fnmatch(rel_path, pattern):
+                return template_path
+        return self.default_path
+
+    def resolver_for(self, rel_path):
+        if self.resolver is None:
+            return None
+        return self.resolver.for_page(rel_path.replace(os.sep, "/"))
+
+    def for_page(self, rel_path):
+        return load_template(self.path_for(rel_path), self.resolver_for(rel_path))
+
+
+def load_template(path, resolver=None):
+    resolver = as_resolver(resolver)
+    key = (os.path.abspath(path), None if resolver is None else resolver.key)
+    cached = _cache.get(key)
+    if cached is not None:
+        mtimes, template = cached
+        if mtimes == _mtimes(template.dependencies):
+            return template
+    template = Template.from_file(path, resolver)
+    _cache[key] = (_mtimes(template.dependencies), template)
+    return template
+
+
+def resolve_urls(html, resolver):
+    return URL_ATTRIBUTE_PATTERN.sub(lambda m: f'{m.group(1)}{resolver.resolve(m.group(2))}"', html)
+
+
+def _is_slot(slots, index):
+    return bool(slots) and slots[-1][0] == index
+
+
+def _parse_file(path, dependencies, stack):
+    path = os.path.abspath(path)
+    if path in stack:
+        raise ValueError(f"template include cycle: {' -> '.join(stack + [path])}")
+    with open(path, "r") as f:
+        text = f.read()
+    if path not in dependencies:
+        dependencies.append(path)
+    base_dir = os.path.dirname(path)
+
+    def load(name):
+        return _parse_file(os.path.join(base_dir, name), dependencies, stack + [path])
+
+    return _expand(text, load)
+
+
+def _parse(text, partials, stack):
+    def load(name):
+        if name in stack:
+            raise ValueError(f"template include cycle: {' -> '.join(stack + [name])}")
+        if name not in partials:
+            raise ValueError(f"unknown partial {name}")
+        return _parse(partials[name], partials, stack + [name])
+
+    return _expand(text, load)
+
+
+def _expand(text, load):
+    layout = None
+    parts = []
+    pos = 0
+    for match in DIRECTIVE_PATTERN.finditer(text):
+        kind, name = match.groups()
+        if kind == "<":
+            if layout is not None or text[:match.start()].strip():
+                raise ValueError("layout directive must come first in a template")
+            layout = name
+        else:
+            parts.extend(_split_slots(text[pos:match.start()]))
+            parts.extend(load(name))
+        pos = match.end()
+    parts.extend(_split_slots(text[pos:]))
+
+    if layout is None:
+        return parts
+    if parts and isinstance(parts[0], str):
+        parts[0] = parts[0].lstrip()
+    expanded = []
+    for part in load(layout):
+        if isinstance(part, tuple) and part[0] == "Content":
+            expanded.extend(parts)
+        else:
+            expanded.append(part)
+    return expanded
+
+
+def _split_slots(text):
+    parts = []
+    pos = 0
+    for match in SLOT_PATTERN.finditer(text):
+        if match.start() > pos:
+            parts.append(text[pos:match.start()])
+        parts.append((match.group(1), match.group(0)))
+        pos = match.end()
+    if pos < len(text):
+        parts.append(text[pos:])
+    return parts
+
+
+def _mtimes(paths):
+    try:
+        return tuple(os.stat(p).st_mtime_ns for p in paths)
+    except OSError:
+        return None
+
+
+def _digest(paths):
+    h = hashlib.sha256()
+    for p in paths:
+        with open(p, "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def _digest_text(text):
+    return hashlib.sha256(text.encode()).hexdigest()
@@ -0,0 +1,111 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import async_build
+from async_build import generate_pages_recursive_async
+from generate_page import generate_pages_recursive
+from manifest import BuildManifest
+from stats import BuildStats
+
+
+class TestAsyncBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        with open(self.template, "w") as f:
+            f.write('<title>{{ Title }}</title><a href="/home">{{ Content }}</a>')
+        for i in range(12):
+            self.write(f"section{i % 3}/page{i}.md", f"# Page {i}\n\nShared **text** and a [link](/p{i})\n")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, text):
+        path = os.path.join(self.content, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read_tree(self, root):
+        files = {}
+        for dirpath, _, filenames in os.walk(root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path) as f:
+                    files[os.path.relpath(path, root)] = f.read()
+        return files
+
+    def test_matches_serial_build(self):
+        serial = os.path.join(self.root, "serial")
+        concurrent = os.path.join(self.root, "async")
+        generate_pages_recursive(self.content, self.template, serial, "/base/")
+        errors = generate_pages_recursive_async(self.content, self.template, concurrent, "/base/", io_workers=3)
+        self.assertEqual(errors, [])
+        self.assertEqual(self.read_tree(concurrent), self.read_tree(serial))
+
+    def test_errors_are_reported_in_page_order(self):
+        self.write("a_broken.md", "no title")
+        self.write("z_broken.md", "still no title")
+        errors = generate_pages_recursive_async(self.content, self.template, os.path.join(self.root, "out"), "/")
+        self.assertEqual([os.path.basename(from_path) for from_path, _ in errors], ["a_broken.md", "z_broken.md"])
+        self.assertIn("no title found", errors[0][1])
+
+    def test_unexpected_errors_do_not_stop_the_build(self):
+        original = async_build.compile_page
+
+        def compile_page(lines, source_path=None, **kwargs):
+            if source_path.endswith("page4.md"):
+                raise RuntimeError("boom")
+            return original(lines, source_path, **kwargs)
+
+        async_build.compile_page = compile_page
+        try:
+            out = os.path.join(self.root, "out")
+            errors = generate_pages_recursive_async(self.content, self.template, out, "/")
+        finally:
+            async_build.compile_page = original
+        self.assertEqual(
+            [(os.path.basename(from_path), error) for from_path, error in errors], [("page4.md", "RuntimeError: boom")]
+        )
+        self.assertEqual(len(self.read_tree(out)), 11)
+
+    def test_manifest_skips_fresh_pages(self):
+        out = os.path.join(self.root, "out")
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        generate_pages_recursive_async(self.content, self.template, out, "/", manifest)
+        stats = BuildStats()
+        generate_pages_recursive_async(self.content, self.template, out, "/", manifest, stats=stats)
+        self.assertEqual(stats["pages_fresh"], 12)
+        self.assertEqual(stats["pages_written"], 0)
+
+    def test_pages_in_flight_are_bounded(self):
+        lock = threading.Lock()
+        in_flight = [0, 0]
+        original = async_build.read_bytes
+
+        def slow_read(path):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight[1], in_flight[0])
+            time.sleep(0.005)
+            with lock:
+                in_flight[0] -= 1
+            return original(path)
+
+        async_build.read_bytes = slow_read
+        try:
+            generate_pages_recursive_async(
+                self.content, self.template, os.path.join(self.root, "out"), "/", io_workers=8, max_pending=2
+            )
+        finally:
+            async_build.read_bytes = original
+        self.assertLessEqual(in_flight[1], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
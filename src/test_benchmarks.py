@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestBenchmarks(unittest.TestCase):
+    def test_run_smoke(self):
+        # A tiny run keeps the benchmark package importable and working as
+        # the pipeline changes underneath it.
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.run", "--pages", "5", "--repeat", "1", "--skip-build"],
+            cwd=ROOT_DIR, capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("5 pages", result.stdout)
+        for stage in ("text_to_textnodes", "template", "write"):
+            self.assertIn(stage, result.stdout)
+
+    def test_node_memory_runs_as_module(self):
+        result = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_node_memory"], cwd=ROOT_DIR, capture_output=True, text=True,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("ParentNode", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import sys
+import unittest
+
+import main
+from block_cache import DEFAULT_MAX_BYTES, BlockCache, RenderedBlock, block_cache
+from block_markdown import iter_blocks, markdown_to_html_node
+from htmlnode import ParentNode
+from stats import BuildStats, counter_delta
+from urls import BasepathResolver
+
+
+def blocks(markdown):
+    return list(iter_blocks(markdown.split("\n")))
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_renders_same_html_as_uncached(self):
+        markdown = "# Title\n\nSome **bold** and a [link](/x)\n\n- one\n- two\n\n```\ncode\n```"
+        cache = BlockCache()
+        node = ParentNode("div", [cache.render(block) for block in blocks(markdown)])
+        self.assertEqual(node.to_html(), markdown_to_html_node(markdown).to_html())
+
+    def test_repeated_block_is_a_hit(self):
+        cache = BlockCache()
+        first = cache.render(blocks("Shared **disclaimer**")[0])
+        second = cache.render(blocks("Shared **disclaimer**")[0])
+        self.assertIs(first, second)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_rendered_block_keeps_metadata_not_node(self):
+        rendered = BlockCache().render(blocks("## Heading with a [link](/x)")[0])
+        self.assertIsInstance(rendered, RenderedBlock)
+        self.assertEqual(rendered.to_html(), '<h2>Heading with a <a href="/x">link</a></h2>')
+        self.assertEqual(rendered.metadata.headings, [(2, "Heading with a link")])
+        self.assertEqual(rendered.metadata.links, ["/x"])
+        self.assertFalse(hasattr(rendered, "node"))
+
+    def test_resolvers_are_cached_separately(self):
+        cache = BlockCache()
+        block = blocks("[home](/)")[0]
+        self.assertEqual(cache.render(block).to_html(), '<p><a href="/">home</a></p>')
+        self.assertEqual(cache.render(block, BasepathResolver("/b/")).to_html(), '<p><a href="/b/">home</a></p>')
+        self.assertEqual(cache.misses, 2)
+
+    def test_evicts_least_recently_used(self):
+        cache = BlockCache(max_bytes=2 * sys.getsizeof("<p>a</p>"))
+        a, b, c = blocks("a\n\nb\n\nc")
+        cache.render(a)
+        cache.render(b)
+        cache.render(a)
+        cache.render(c)
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertEqual(cache.size, 2 * sys.getsizeof("<p>a</p>"))
+        cache.resize(sys.getsizeof("<p>a</p>"))
+        self.assertEqual(list(cache.entries), ["c"])
+
+    def test_blocks_larger_than_the_cache_are_not_kept(self):
+        cache = BlockCache(max_bytes=sys.getsizeof("<p>a</p>"))
+        rendered = cache.render(blocks("a much longer paragraph")[0])
+        self.assertEqual(rendered.to_html(), "<p>a much longer paragraph</p>")
+        self.assertEqual((len(cache), cache.size), (0, 0))
+
+    def test_disabled_cache_returns_plain_nodes(self):
+        cache = BlockCache(max_bytes=0)
+        node = cache.render(blocks("text")[0])
+        self.assertNotIsInstance(node, RenderedBlock)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.misses, 1)
+
+
+    def test_main_sizes_the_shared_cache(self):
+        self.addCleanup(block_cache.resize, block_cache.max_bytes)
+        args = main.parse_args(["--block-cache-size", "0"])
+        self.assertEqual(args.block_cache_size, 0)
+        self.assertEqual(main.parse_args([]).block_cache_size, DEFAULT_MAX_BYTES // (1024 * 1024))
+        block_cache.resize(args.block_cache_size * 1024 * 1024)
+        self.assertNotIsInstance(block_cache.render(blocks("shared text")[0]), RenderedBlock)
+        self.assertEqual(len(block_cache), 0)
+
+
+class TestBuildStats(unittest.TestCase):
+    def test_merge_and_report(self):
+        stats = BuildStats()
+        stats.merge({"block_cache_hits": 3, "block_cache_misses": 1})
+        stats.add("block_cache_hits")
+        self.assertEqual(stats["block_cache_hits"], 4)
+        self.assertEqual(stats.report(), "Block cache: 4 hits, 1 misses (80.0% hit rate)")
+
+    def test_empty_report(self):
+        self.assertEqual(BuildStats().report(), "")
+
+    def test_counter_delta(self):
+        self.assertEqual(counter_delta({"a": 5, "b": 2}, {"a": 3}), {"a": 2, "b": 2})
+
+
+if __name__ == "__main__":
+    unittest.main()
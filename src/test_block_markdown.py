@@ -1,5 +1,7 @@
 import unittest
-from block_markdown import BlockType, block_to_block_type, markdown_to_blocks, markdown_to_html_node
+import io
+
+from block_markdown import Block, BlockType, block_to_block_type, iter_blocks, markdown_to_blocks, markdown_to_html_node
 
 class TestBlockMarkdown(unittest.TestCase):
     def test_markdown_to_blocks(self):
@@ -190,5 +192,41 @@ the **same** even with inline stuff
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_iter_blocks_from_file(self):
+        md = io.StringIO("""# Title
+
+  Some text
+spanning lines  
+
+- a
+- b
+
+
+```
+code
+```
+""")
+        self.assertEqual(
+            list(iter_blocks(md)),
+            [
+                Block(BlockType.HEADING, ["# Title"], 1, 1),
+                Block(BlockType.PARAGRAPH, ["Some text", "spanning lines"], 3, 4),
+                Block(BlockType.ULIST, ["- a", "- b"], 6, 7),
+                Block(BlockType.CODE, ["```", "code", "```"], 10, 12),
+            ],
+        )
+
+    def test_iter_blocks_skips_whitespace_only_lines_at_edges(self):
+        blocks = list(iter_blocks(["  ", "text", " "]))
+        self.assertEqual(blocks, [Block(BlockType.PARAGRAPH, ["text"], 2, 2)])
+
+    def test_block_to_block_type_ordered_list_out_of_order(self):
+        block = "1. first\n3. third"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
+    def test_block_to_block_type_mixed_list(self):
+        block = "- item\nnot an item"
+        self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,94 @@
+import contextlib
+import gzip
+import io
+import os
+import tempfile
+import unittest
+
+import main
+from compress import compressor, precompress_directory
+
+
+class TestPrecompress(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, data):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_writes_gzip_siblings_for_text_assets(self):
+        page = self.write("blog/index.html", b"<p>hello</p>" * 200)
+        self.write("images/photo.png", b"\x89PNG" * 500)
+        written, skipped, removed = precompress_directory(self.root, min_size=100)
+        self.assertEqual(written, [page + ".gz"])
+        self.assertEqual((skipped, removed), ([], []))
+        with gzip.open(page + ".gz") as f:
+            self.assertEqual(f.read(), b"<p>hello</p>" * 200)
+        self.assertEqual(os.stat(page + ".gz").st_mtime_ns, os.stat(page).st_mtime_ns)
+
+    def test_skips_small_files(self):
+        self.write("index.html", b"<p>tiny</p>")
+        self.assertEqual(precompress_directory(self.root, min_size=100), ([], [], []))
+
+    def test_up_to_date_siblings_are_skipped(self):
+        page = self.write("index.html", b"a" * 2000)
+        precompress_directory(self.root)
+        written, skipped, _ = precompress_directory(self.root)
+        self.assertEqual((written, skipped), ([], [page + ".gz"]))
+
+        os.utime(page, ns=(1, 1))
+        written, _, _ = precompress_directory(self.root)
+        self.assertEqual(written, [page + ".gz"])
+
+    def test_removes_orphaned_siblings(self):
+        page = self.write("index.html", b"a" * 2000)
+        archive = self.write("archive.txt.gz", b"shipped as is")
+        assets = {"archive.txt.gz"}
+        precompress_directory(self.root, assets=assets)
+        os.remove(page)
+        _, _, removed = precompress_directory(self.root, assets=assets)
+        self.assertEqual(removed, [page + ".gz"])
+        self.assertEqual(os.listdir(self.root), ["archive.txt.gz"])
+        with open(archive, "rb") as f:
+            self.assertEqual(f.read(), b"shipped as is")
+
+    def test_shipped_siblings_are_not_overwritten(self):
+        self.write(os.path.join("css", "site.css"), b"a" * 2000)
+        shipped = self.write(os.path.join("css", "site.css.gz"), b"hand made")
+        written, skipped, removed = precompress_directory(self.root, assets={os.path.join("css", "site.css.gz")})
+        self.assertEqual((written, skipped, removed), ([], [], []))
+        with open(shipped, "rb") as f:
+            self.assertEqual(f.read(), b"hand made")
+
+    def test_output_is_deterministic(self):
+        compress = compressor("gz")
+        self.assertEqual(compress(b"x" * 5000), compress(b"x" * 5000))
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            compressor("br")
+
+    def test_level_out_of_range(self):
+        with self.assertRaisesRegex(ValueError, "between 0 and 9"):
+            compressor("gz", 12)
+        with self.assertRaisesRegex(ValueError, "between 1 and 22"):
+            compressor("zst", 0)
+
+    def test_main_rejects_level_before_building(self):
+        stderr = io.StringIO()
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(stderr):
+            main.parse_args(["--precompress", "gz", "--compress-level", "12"])
+        self.assertIn("--compress-level: gz compression level must be between 0 and 9", stderr.getvalue())
+        self.assertEqual(main.parse_args(["--precompress", "gz", "--compress-level", "6"]).compress_level, 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
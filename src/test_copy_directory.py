@@ -0,0 +1,86 @@
+import os
+import tempfile
+import unittest
+
+from copy_directory import copy_file, list_files, sync_directory
+
+
+class TestSyncDirectory(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dst = os.path.join(self.tmp.name, "public")
+        os.makedirs(os.path.join(self.src, "images"))
+        self.write(os.path.join(self.src, "index.css"), "body {}")
+        self.write(os.path.join(self.src, "images", "a.png"), "png-bytes")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def test_list_files(self):
+        self.assertEqual(list_files(self.src), ["index.css", os.path.join("images", "a.png")])
+
+    def test_first_sync_copies_everything(self):
+        assets = {}
+        copied, removed = sync_directory(self.src, self.dst, assets)
+        self.assertEqual(len(copied), 2)
+        self.assertEqual(removed, [])
+        self.assertEqual(self.read(os.path.join(self.dst, "index.css")), "body {}")
+        self.assertEqual(set(assets), {"index.css", os.path.join("images", "a.png")})
+
+    def test_second_sync_copies_nothing(self):
+        assets = {}
+        sync_directory(self.src, self.dst, assets)
+        copied, removed = sync_directory(self.src, self.dst, assets)
+        self.assertEqual((copied, removed), ([], []))
+
+    def test_changed_file_is_recopied(self):
+        assets = {}
+        sync_directory(self.src, self.dst, assets)
+        self.write(os.path.join(self.src, "index.css"), "body { color: red }")
+        copied, _ = sync_directory(self.src, self.dst, assets)
+        self.assertEqual(copied, [os.path.join(self.dst, "index.css")])
+        self.assertEqual(self.read(os.path.join(self.dst, "index.css")), "body { color: red }")
+
+    def test_stale_files_removed_but_pages_kept(self):
+        assets = {}
+        sync_directory(self.src, self.dst, assets)
+        page = os.path.join(self.dst, "index.html")
+        self.write(page, "<html></html>")
+        os.remove(os.path.join(self.src, "images", "a.png"))
+        _, removed = sync_directory(self.src, self.dst, assets)
+        self.assertEqual(removed, [os.path.join(self.dst, "images", "a.png")])
+        self.assertTrue(os.path.exists(page))
+
+    def test_checksum_mode_ignores_mtime(self):
+        assets = {}
+        sync_directory(self.src, self.dst, assets, checksum=True)
+        os.utime(os.path.join(self.src, "index.css"), ns=(0, 0))
+        copied, _ = sync_directory(self.src, self.dst, assets, checksum=True)
+        self.assertEqual(copied, [])
+
+    def test_hardlink(self):
+        sync_directory(self.src, self.dst, {}, hardlink=True)
+        src_stat = os.stat(os.path.join(self.src, "index.css"))
+        dst_stat = os.stat(os.path.join(self.dst, "index.css"))
+        self.assertEqual(src_stat.st_ino, dst_stat.st_ino)
+
+    def test_copy_file_preserves_mtime(self):
+        src_path = os.path.join(self.src, "index.css")
+        dst_path = os.path.join(self.dst, "nested", "index.css")
+        copy_file(src_path, dst_path)
+        self.assertEqual(os.stat(src_path).st_mtime_ns, os.stat(dst_path).st_mtime_ns)
+        self.assertEqual(os.listdir(os.path.dirname(dst_path)), ["index.css"])
+
+
+if __name__ == "__main__":
+    unittest.main()
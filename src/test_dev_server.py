@@ -0,0 +1,123 @@
+import gzip
+import os
+import tempfile
+import threading
+import unittest
+import urllib.request
+
+from dev_server import DevServer, accepts_gzip, etag_matches, make_server
+from generate_page import generate_pages_recursive
+
+
+class TestDevServer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, '<title>{{ Title }}</title><link href="/index.css">{{ Content }}')
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\n" + "Some [text](/blog/post/). " * 100)
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\nbody")
+        self.write(os.path.join(self.static, "index.css"), "body { color: red; }")
+        self.server = DevServer(self.content, self.static, self.template, "/base/")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text, mtime_ns=None):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        if mtime_ns is not None:
+            os.utime(path, ns=(mtime_ns, mtime_ns))
+
+    def test_page_matches_built_output(self):
+        docs = os.path.join(self.root, "docs")
+        generate_pages_recursive(self.content, self.template, docs, "/base/")
+        for url, built in (("/base/", "index.html"), ("/base/blog/post/index.html", "blog/post/index.html")):
+            with open(os.path.join(docs, built), "rb") as f:
+                expected = f.read()
+            response = self.server.respond(url)
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.headers["Content-Type"], "text/html; charset=utf-8")
+            self.assertEqual(response.body, expected)
+
+    def test_cache_is_invalidated_by_source_mtime(self):
+        path = os.path.join(self.content, "blog", "post", "index.md")
+        first = self.server.respond("/base/blog/post/")
+        self.assertEqual(self.server.respond("/base/blog/post/").body, first.body)
+        self.assertEqual((self.server.hits, self.server.misses), (1, 1))
+        self.write(path, "# Changed\n\nbody", mtime_ns=os.stat(path).st_mtime_ns + 10**9)
+        second = self.server.respond("/base/blog/post/")
+        self.assertIn(b"<title>Changed</title>", second.body)
+        self.assertNotEqual(second.headers["ETag"], first.headers["ETag"])
+        os.remove(path)
+        self.assertEqual(self.server.respond("/base/blog/post/").status, 404)
+
+    def test_template_change_invalidates_pages(self):
+        self.server.respond("/base/blog/post/")
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}", mtime_ns=os.stat(self.template).st_mtime_ns + 10**9)
+        self.assertTrue(self.server.respond("/base/blog/post/").body.startswith(b"<h1>Post</h1>"))
+
+    def test_etag_and_gzip(self):
+        plain = self.server.respond("/base/")
+        self.assertNotIn("Content-Encoding", plain.headers)
+        compressed = self.server.respond("/base/", {"Accept-Encoding": "br, gzip"})
+        self.assertEqual(compressed.headers["Content-Encoding"], "gzip")
+        self.assertEqual(compressed.headers["Vary"], "Accept-Encoding")
+        self.assertEqual(gzip.decompress(compressed.body), plain.body)
+        self.assertNotEqual(compressed.headers["ETag"], plain.headers["ETag"])
+
+        not_modified = self.server.respond("/base/", {"If-None-Match": plain.headers["ETag"]})
+        self.assertEqual((not_modified.status, not_modified.body), (304, b""))
+        stale = self.server.respond("/base/", {"Accept-Encoding": "gzip", "If-None-Match": plain.headers["ETag"]})
+        self.assertEqual(stale.status, 200)
+
+    def test_small_files_are_not_compressed(self):
+        response = self.server.respond("/base/index.css", {"Accept-Encoding": "gzip"})
+        self.assertEqual(response.body, b"body { color: red; }")
+        self.assertEqual(response.headers["Content-Type"], "text/css; charset=utf-8")
+        self.assertNotIn("Content-Encoding", response.headers)
+
+    def test_paths(self):
+        self.assertEqual(self.server.respond("/base").headers["Location"], "/base/")
+        self.assertEqual(self.server.respond("/base/blog/post").headers["Location"], "/base/blog/post/")
+        self.assertEqual(self.server.respond("/base/index.html").status, 200)
+        self.assertEqual(self.server.respond("/index.css").status, 404)
+        self.assertEqual(self.server.respond("/base/../template.html").status, 404)
+        self.assertEqual(self.server.respond("/base/missing/").status, 404)
+
+    def test_render_error(self):
+        self.write(os.path.join(self.content, "untitled.md"), "no title")
+        response = self.server.respond("/base/untitled.html")
+        self.assertEqual(response.status, 500)
+        self.assertIn(b"no title", response.body)
+
+    def test_header_parsing(self):
+        self.assertTrue(accepts_gzip("deflate, gzip;q=0.5"))
+        self.assertFalse(accepts_gzip("gzip;q=0, br"))
+        self.assertFalse(accepts_gzip(""))
+        self.assertTrue(etag_matches('W/"a", "b"', '"a"'))
+        self.assertFalse(etag_matches('"a"', '"b"'))
+
+    def test_http(self):
+        httpd = make_server(self.server, "127.0.0.1", 0)
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+        self.addCleanup(httpd.server_close)
+        self.addCleanup(thread.join)
+        self.addCleanup(httpd.shutdown)
+        host, port = httpd.server_address
+        request = urllib.request.Request(f"http://{host}:{port}/base/", headers={"Accept-Encoding": "gzip"})
+        with urllib.request.urlopen(request) as response:
+            self.assertEqual(response.headers["Content-Encoding"], "gzip")
+            self.assertIn(b"<title>Home</title>", gzip.decompress(response.read()))
+        head = urllib.request.Request(f"http://{host}:{port}/base/index.css", method="HEAD")
+        with urllib.request.urlopen(head) as response:
+            self.assertEqual(response.headers["Content-Length"], "20")
+            self.assertEqual(response.read(), b"")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,5 +1,9 @@
+import os
+import tempfile
 import unittest
-from generate_page import extract_title
+from generate_page import extract_title, generate_pages_recursive, write_page
+from manifest import file_hash
+from urls import RelativeResolver
 
 class TestExtractTitle(unittest.TestCase):
     def test_extract_title(self):
@@ -58,5 +62,95 @@ no title
         except Exception as e:
             pass
 
+
+class TestWritePage(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp.name, "out", "index.html")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_writes_new_file(self):
+        written, output_hash = write_page(self.dest, iter(["<p>", "héllo", "</p>"]))
+        self.assertTrue(written)
+        with open(self.dest, encoding="utf-8") as f:
+            self.assertEqual(f.read(), "<p>héllo</p>")
+        self.assertEqual(output_hash, file_hash(self.dest))
+
+    def test_identical_output_is_not_rewritten(self):
+        write_page(self.dest, "<p>same</p>")
+        os.utime(self.dest, ns=(0, 0))
+        written, output_hash = write_page(self.dest, ["<p>", "same</p>"])
+        self.assertFalse(written)
+        self.assertEqual(os.stat(self.dest).st_mtime_ns, 0)
+        self.assertEqual(output_hash, file_hash(self.dest))
+
+    def test_changed_output_replaces_file(self):
+        write_page(self.dest, "<p>old</p>")
+        written, _ = write_page(self.dest, "<p>new</p>")
+        self.assertTrue(written)
+        with open(self.dest) as f:
+            self.assertEqual(f.read(), "<p>new</p>")
+
+    def test_no_temp_file_left_on_error(self):
+        def chunks():
+            yield "<p>"
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            write_page(self.dest, chunks())
+        self.assertEqual(os.listdir(os.path.dirname(self.dest)), [])
+
+
+
+class TestUrlResolution(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self.write(self.template, '<link href="/index.css">{{ Content }}')
+        self.write(
+            os.path.join(self.content, "index.md"),
+            '# Home\n\nSee [the post](/blog/post/) and `<a href="/raw">`\n\n```\n<img src="/raw.png">\n```',
+        )
+        self.write(os.path.join(self.content, "blog", "post", "index.md"), "# Post\n\n![me](/me.png) [home](/)")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, *parts):
+        with open(os.path.join(self.root, *parts)) as f:
+            return f.read()
+
+    def test_basepath_leaves_code_alone(self):
+        generate_pages_recursive(self.content, self.template, os.path.join(self.root, "docs"), "/base/")
+        html = self.read("docs", "index.html")
+        self.assertIn('<link href="/base/index.css">', html)
+        self.assertIn('<a href="/base/blog/post/">the post</a>', html)
+        self.assertIn('<code><a href="/raw"></code>', html)
+        self.assertIn('<img src="/raw.png">', html)
+
+    def test_relative_urls_match_across_workers(self):
+        for name, jobs in (("serial", 1), ("parallel", 2)):
+            generate_pages_recursive(
+                self.content, self.template, os.path.join(self.root, name), "/", jobs=jobs,
+                resolver=RelativeResolver(),
+            )
+        html = self.read("serial", "blog", "post", "index.html")
+        self.assertEqual(
+            html, '<link href="../../index.css"><div><h1>Post</h1><p><img src="../../me.png">me</img> '
+            '<a href="../../">home</a></p></div>',
+        )
+        self.assertEqual(self.read("parallel", "blog", "post", "index.html"), html)
+        self.assertIn('<link href="index.css">', self.read("serial", "index.html"))
+
+
 if __name__ == "__main__":
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -1,3 +1,4 @@
+import io
 import unittest
 from htmlnode import HtmlNode, LeafNode, ParentNode
 
@@ -35,6 +36,12 @@ class TestHtmlNode(unittest.TestCase):
         expected = "HtmlNode(None, None, None, None)"
         self.assertEqual(repr(node), expected)
 
+    def test_nodes_have_no_instance_dict(self):
+        for node in (HtmlNode(), LeafNode("p", "x"), ParentNode("div", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
+            with self.assertRaises(AttributeError):
+                node.extra = 1
+
     def test_to_html_not_implemented(self):
         node = HtmlNode("div", "Hello, world!")
         with self.assertRaises(NotImplementedError):
@@ -212,6 +219,52 @@ class TestParentNode(unittest.TestCase):
             "<div><p>Text with <special> chars</p><p>More text with & symbols</p></div>"
         )
 
+    def test_iter_html_matches_to_html(self):
+        node = ParentNode(
+            "section",
+            [
+                LeafNode("span", "text"),
+                ParentNode("div", [LeafNode("p", "paragraph")], {"class": "x"}),
+                LeafNode(None, "raw"),
+            ],
+        )
+        chunks = list(node.iter_html())
+        self.assertEqual(chunks[0], "<section>")
+        self.assertEqual("".join(chunks), node.to_html())
+
+    def test_iter_html_validates_lazily(self):
+        node = ParentNode("div", [ParentNode("p", None)])
+        chunks = node.iter_html()
+        self.assertEqual(next(chunks), "<div>")
+        with self.assertRaises(ValueError):
+            next(chunks)
+
+    def test_write_to(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode("b", "one")]), ParentNode("li", [LeafNode(None, "two")])])
+        fp = io.StringIO()
+        node.write_to(fp)
+        self.assertEqual(fp.getvalue(), "<ul><li><b>one</b></li><li>two</li></ul>")
+
+    def test_leaf_write_to(self):
+        fp = io.StringIO()
+        LeafNode("a", "link", {"href": "/x"}).write_to(fp)
+        self.assertEqual(fp.getvalue(), '<a href="/x">link</a>')
+
+    def test_to_html_deep_tree_without_recursion(self):
+        depth = 20000
+        node = LeafNode("span", "leaf")
+        for _ in range(depth):
+            node = ParentNode("div", [node])
+        html = node.to_html()
+        self.assertEqual(html, "<div>" * depth + "<span>leaf</span>" + "</div>" * depth)
+        self.assertEqual("".join(node.iter_html()), html)
+
+    def test_to_html_validates_nested_leaf(self):
+        node = ParentNode("div", [LeafNode("p", "ok"), ParentNode("ul", [LeafNode("li", None)])])
+        with self.assertRaises(ValueError) as context:
+            node.to_html()
+        self.assertEqual(str(context.exception), "value is required")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -242,5 +242,61 @@ class TestSplitNodesDelimiter(unittest.TestCase):
             ],
         )
 
+    def test_split_links_after_matching_image(self):
+        node = TextNode("![x](/a.png) and [x](/a.png)", TextType.NORMAL)
+        self.assertListEqual(
+            split_nodes_link([node]),
+            [
+                TextNode("![x](/a.png) and ", TextType.NORMAL),
+                TextNode("x", TextType.LINK, "/a.png"),
+            ],
+        )
+
+    def test_split_repeated_links(self):
+        node = TextNode("[a](/a) [a](/a) [a](/a)", TextType.NORMAL)
+        new_nodes = split_nodes_link([node])
+        self.assertEqual(len(new_nodes), 5)
+        self.assertEqual(new_nodes[1], TextNode(" ", TextType.NORMAL))
+        self.assertEqual(new_nodes[4], TextNode("a", TextType.LINK, "/a"))
+
+    def test_text_to_textnodes_matches_multi_pass_pipeline(self):
+        texts = [
+            "plain text only",
+            "**bold** at the start and _italic_ at the end_ _",
+            "`code` then ![img](/a.png)![img2](/b.png) and [l1](/x) [l2](/y)",
+            "a [broken link](/x and ![broken image] but **bold**",
+            "",
+        ]
+        for text in texts:
+            nodes = [TextNode(text, TextType.NORMAL)]
+            nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+            nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+            nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+            nodes = split_nodes_link(split_nodes_image(nodes))
+            self.assertListEqual(text_to_textnodes(text), nodes)
+
+    def test_text_to_textnodes_code_is_literal(self):
+        self.assertListEqual(
+            text_to_textnodes("run `a ** b` now"),
+            [
+                TextNode("run ", TextType.NORMAL),
+                TextNode("a ** b", TextType.CODE),
+                TextNode(" now", TextType.NORMAL),
+            ],
+        )
+
+    def test_text_to_textnodes_underscore_in_url(self):
+        self.assertListEqual(
+            text_to_textnodes("see [snake_case](https://example.com/a_b)"),
+            [
+                TextNode("see ", TextType.NORMAL),
+                TextNode("snake_case", TextType.LINK, "https://example.com/a_b"),
+            ],
+        )
+
+    def test_text_to_textnodes_unclosed_delimiter(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("this is **not closed")
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,91 @@
+import os
+import tempfile
+import unittest
+
+from generate_page import generate_pages_recursive
+from manifest import BuildManifest, file_hash
+
+
+TEMPLATE = "<title>{{ Title }}</title><body>{{ Content }}</body>"
+
+
+class TestBuildManifest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.content = os.path.join(self.root, "content")
+        self.public = os.path.join(self.root, "public")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest_path = os.path.join(self.root, "manifest.json")
+        os.makedirs(os.path.join(self.content, "blog"))
+        self.write(self.template, TEMPLATE)
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nhello")
+        self.write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nworld")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def build(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        generate_pages_recursive(self.content, self.template, self.public, "/", manifest)
+        manifest.remove_stale()
+        manifest.save()
+        return manifest
+
+    def mtimes(self):
+        return {
+            name: os.stat(os.path.join(self.public, name)).st_mtime_ns
+            for name in ("index.html", os.path.join("blog", "post.html"))
+        }
+
+    def test_first_build_records_every_page(self):
+        manifest = self.build()
+        self.assertEqual(len(manifest.pages), 2)
+        entry = manifest.pages[os.path.join(self.content, "index.md")]
+        self.assertEqual(entry["basepath"], "/")
+        self.assertEqual(entry["output_hash"], file_hash(os.path.join(self.public, "index.html")))
+
+    def test_rebuild_skips_unchanged_pages(self):
+        self.build()
+        before = self.mtimes()
+        self.write(os.path.join(self.content, "index.md"), "# Home\n\nchanged")
+        self.build()
+        after = self.mtimes()
+        self.assertNotEqual(before["index.html"], after["index.html"])
+        post = os.path.join("blog", "post.html")
+        self.assertEqual(before[post], after[post])
+
+    def test_template_change_rebuilds_all(self):
+        self.build()
+        self.write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.build()
+        with open(os.path.join(self.public, "blog", "post.html")) as f:
+            self.assertEqual(f.read(), "<h1>Post</h1><div><h1>Post</h1><p>world</p></div>")
+
+    def test_modified_output_is_regenerated(self):
+        self.build()
+        out = os.path.join(self.public, "index.html")
+        self.write(out, "tampered")
+        self.build()
+        with open(out) as f:
+            self.assertIn("hello", f.read())
+
+    def test_deleted_source_removes_output(self):
+        self.build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        manifest = self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "post.html")))
+        self.assertEqual(len(manifest.pages), 1)
+
+    def test_load_ignores_corrupt_manifest(self):
+        self.write(self.manifest_path, "{not json")
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(manifest.pages, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+import unittest
+
+from block_cache import block_cache
+from page import Page, compile_page
+
+
+def compile_text(text):
+    return compile_page(text.split("\n"), "page.md")
+
+
+class TestCompilePage(unittest.TestCase):
+    def test_metadata(self):
+        page = compile_text(
+            "# The **Title**\n\n"
+            "Intro with a [link](/a) and ![alt text](/img.png).\n\n"
+            "## Section\n\n"
+            "- item [two](https://example.com)\n\n"
+            "```\ncode words are not counted\n```"
+        )
+        self.assertEqual(page.title, "The Title")
+        self.assertEqual(page.headings, [(1, "The Title"), (2, "Section")])
+        self.assertEqual(page.links, ["/a", "https://example.com"])
+        self.assertEqual(page.images, [("/img.png", "alt text")])
+        self.assertEqual(page.word_count, 2 + 6 + 1 + 2)
+
+    def test_html_matches_node_tree(self):
+        page = compile_text("# Title\n\nbody")
+        self.assertEqual(page.html, "<div><h1>Title</h1><p>body</p></div>")
+        self.assertEqual(page.rendered().content, page.html)
+
+    def test_title_is_first_h1(self):
+        page = compile_text("## Sub\n\n```\n# not a title\n```\n\n# Real")
+        self.assertEqual(page.title, "Real")
+
+    def test_no_title(self):
+        with self.assertRaises(ValueError):
+            compile_text("## Only a subheading")
+
+    def test_cached_blocks_keep_their_metadata(self):
+        text = "# Title\n\nShared [footer](/footer-link-for-test-page) text"
+        compile_text(text)
+        self.assertEqual(compile_text(text).links, ["/footer-link-for-test-page"])
+        self.assertIsNotNone(block_cache.entries["Shared [footer](/footer-link-for-test-page) text"].metadata)
+
+    def test_dict_round_trip(self):
+        page = compile_text("# Title\n\n![a](/b.png) [c](/d)").rendered()
+        copy = Page.from_dict("page.md", page.to_dict())
+        self.assertEqual(copy.to_dict(), page.to_dict())
+        self.assertEqual(copy.images, [("/b.png", "a")])
+
+
+if __name__ == "__main__":
+    unittest.main()
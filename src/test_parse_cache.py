@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+
+from generate_page import cached_render_page_file, render_page_file
+from parse_cache import ParseCache
+from urls import BasepathResolver
+
+
+class TestParseCache(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ParseCache(os.path.join(self.tmp.name, "cache"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_put_and_get(self):
+        key = self.cache.key(b"# Title")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, {"html": "<h1>Title</h1>", "title": "Title"})
+        entry = self.cache.get(key)
+        self.assertEqual(entry["html"], "<h1>Title</h1>")
+        self.assertEqual(entry["title"], "Title")
+
+    def test_corrupt_entry_is_a_miss(self):
+        key = self.cache.key(b"x")
+        os.makedirs(os.path.dirname(self.cache.path_for(key)))
+        with open(self.cache.path_for(key), "w") as f:
+            f.write("{not json")
+        self.assertIsNone(self.cache.get(key))
+
+    def test_prune_removes_old_versions_and_oldest_entries(self):
+        old_version = os.path.join(self.cache.directory, "parse-v0")
+        os.makedirs(old_version)
+        keys = [self.cache.key(bytes([i])) for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.put(key, {"html": "x" * 100, "title": "t"})
+            os.utime(self.cache.path_for(key), ns=(i * 10**9, i * 10**9))
+        self.cache.max_bytes = 2 * os.path.getsize(self.cache.path_for(keys[0]))
+        removed = self.cache.prune()
+        self.assertEqual(removed, [self.cache.path_for(keys[0])])
+        self.assertFalse(os.path.exists(old_version))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+
+    def test_prune_keeps_directories_it_does_not_own(self):
+        foreign = ["venv", "vendor", "v3", "parse-v2-backup", "png-v1"]
+        for name in foreign:
+            os.makedirs(os.path.join(self.cache.directory, name))
+            self.write(os.path.join("cache", name, "keep.txt"), "keep")
+        self.cache.prune()
+        for name in foreign:
+            self.assertTrue(os.path.exists(os.path.join(self.cache.directory, name, "keep.txt")), name)
+
+    def test_cached_render_matches_uncached(self):
+        path = self.write("page.md", "# Hello\r\n\r\nSome **text** [here](/x)\r\n")
+        expected = render_page_file(path)[0].to_dict()
+        first = cached_render_page_file(path, self.cache)
+        second = cached_render_page_file(path, self.cache)
+        self.assertEqual(first[0].to_dict(), expected)
+        self.assertEqual(second[0].to_dict(), expected)
+        self.assertEqual(second[0].links, ["/x"])
+        self.assertEqual(first[1]["parse_cache_misses"], 1)
+        self.assertEqual(second[1], {"parse_cache_hits": 1})
+
+    def test_resolver_is_part_of_the_key(self):
+        path = self.write("page.md", "# Home\n\n[up](/)")
+        cached_render_page_file(path, self.cache, resolver=BasepathResolver("/a/"))
+        page, counters = cached_render_page_file(path, self.cache, resolver=BasepathResolver("/b/"))
+        self.assertEqual(counters["parse_cache_misses"], 1)
+        self.assertIn('href="/b/"', page.html)
+
+    def test_changed_content_misses(self):
+        path = self.write("page.md", "# One")
+        cached_render_page_file(path, self.cache)
+        self.write("page.md", "# Two")
+        page, counters = cached_render_page_file(path, self.cache)
+        self.assertEqual(page.title, "Two")
+        self.assertEqual(counters["parse_cache_misses"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,156 @@
+import os
+import random
+import struct
+import tempfile
+import unittest
+import zlib
+
+from copy_directory import sync_directory
+from png import (
+    CHANNELS, PNG_CACHE_VERSION, PNG_SIGNATURE, PngError, PngOptimizer, SwarMasks, from_bytes, optimize_png,
+    read_chunks, to_bytes, unfilter, write_chunk,
+)
+
+
+def make_png(width, height, color_type=2, rows=None, filter_type=0, interlace=0, extra_chunks=()):
+    channels = CHANNELS[color_type]
+    if rows is None:
+        rng = random.Random(width * height)
+        # Smooth gradients with a little noise, like a photo.
+        rows = [
+            bytes((x * 3 + y * 5 + c * 40 + rng.randrange(4)) & 0xFF for x in range(width) for c in range(channels))
+            for y in range(height)
+        ]
+    raw = b"".join(bytes([filter_type]) + filtered(row, prior, filter_type, channels)
+                   for row, prior in zip(rows, [bytes(len(rows[0]))] + rows))
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, interlace)
+    chunks = [write_chunk(b"IHDR", ihdr), *(write_chunk(t, b) for t, b in extra_chunks)]
+    chunks.append(write_chunk(b"IDAT", zlib.compress(raw, 1)))
+    chunks.append(write_chunk(b"IEND", b""))
+    return PNG_SIGNATURE + b"".join(chunks), rows
+
+
+def filtered(row, prior, filter_type, bpp):
+    out = bytearray(len(row))
+    for i in range(len(row)):
+        a = row[i - bpp] if i >= bpp else 0
+        b = prior[i]
+        c = prior[i - bpp] if i >= bpp else 0
+        if filter_type == 0:
+            predictor = 0
+        elif filter_type == 1:
+            predictor = a
+        elif filter_type == 2:
+            predictor = b
+        elif filter_type == 3:
+            predictor = (a + b) // 2
+        else:
+            p = a + b - c
+            pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+            predictor = a if pa <= pb and pa <= pc else b if pb <= pc else c
+        out[i] = (row[i] - predictor) & 0xFF
+    return bytes(out)
+
+
+def decode_rows(data):
+    chunks = read_chunks(data)
+    width, height, bit_depth, color_type = struct.unpack(">IIBB", chunks[0][1][:10])
+    bpp = CHANNELS[color_type] * bit_depth // 8
+    raw = zlib.decompress(b"".join(body for chunk_type, body in chunks if chunk_type == b"IDAT"))
+    return unfilter(raw, height, width * bpp, bpp)
+
+
+class TestOptimizePng(unittest.TestCase):
+    def test_every_input_filter_round_trips(self):
+        for filter_type in range(5):
+            data, rows = make_png(37, 11, filter_type=filter_type)
+            self.assertEqual(decode_rows(data), rows)
+            self.assertEqual(decode_rows(optimize_png(data)), rows)
+
+    def test_rgba_and_grayscale(self):
+        for color_type in (0, 4, 6):
+            data, rows = make_png(20, 9, color_type=color_type, filter_type=4)
+            self.assertEqual(decode_rows(optimize_png(data)), rows)
+
+    def test_output_is_smaller(self):
+        data, _ = make_png(64, 64)
+        self.assertLess(len(optimize_png(data)), len(data))
+
+    def test_drops_metadata_and_keeps_transparency(self):
+        data, rows = make_png(16, 16, extra_chunks=[(b"tEXt", b"Comment\x00hello" * 50), (b"tRNS", b"\x00\x01\x00\x02\x00\x03")])
+        chunk_types = [chunk_type for chunk_type, _ in read_chunks(optimize_png(data))]
+        self.assertEqual(chunk_types, [b"IHDR", b"tRNS", b"IDAT", b"IEND"])
+
+    def test_interlaced_images_are_returned_unchanged(self):
+        data, _ = make_png(8, 8, interlace=1)
+        self.assertIs(optimize_png(data), data)
+
+    def test_animated_images_are_returned_unchanged(self):
+        actl = struct.pack(">II", 2, 0)
+        fctl = struct.pack(">IIIIIHHBB", 0, 8, 8, 0, 0, 1, 10, 0, 0)
+        data, _ = make_png(8, 8, extra_chunks=[(b"acTL", actl), (b"fcTL", fctl)])
+        self.assertIs(optimize_png(data), data)
+
+    def test_bad_crc(self):
+        data, _ = make_png(4, 4)
+        with self.assertRaises(PngError):
+            read_chunks(data[:-1] + bytes([data[-1] ^ 1]))
+
+    def test_not_a_png(self):
+        with self.assertRaises(PngError):
+            optimize_png(b"GIF89a")
+
+
+class TestSwarMasks(unittest.TestCase):
+    def test_bytewise_arithmetic(self):
+        rng = random.Random(1)
+        x = bytes(rng.randrange(256) for _ in range(33))
+        y = bytes(rng.randrange(256) for _ in range(33))
+        masks = SwarMasks(33)
+        self.assertEqual(to_bytes(masks.add(from_bytes(x), from_bytes(y)), 33), bytes((a + b) & 0xFF for a, b in zip(x, y)))
+        self.assertEqual(to_bytes(masks.sub(from_bytes(x), from_bytes(y)), 33), bytes((a - b) & 0xFF for a, b in zip(x, y)))
+        self.assertEqual(to_bytes(masks.average(from_bytes(x), from_bytes(y)), 33), bytes((a + b) // 2 for a, b in zip(x, y)))
+
+
+class TestPngOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dst = os.path.join(self.tmp.name, "docs")
+        os.makedirs(self.src)
+        self.data, self.rows = make_png(48, 48)
+        with open(os.path.join(self.src, "image.png"), "wb") as f:
+            f.write(self.data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_results_are_cached_by_input_hash(self):
+        cache_dir = os.path.join(self.tmp.name, "cache")
+        optimized = PngOptimizer(cache_dir).optimize_file(os.path.join(self.src, "image.png"))
+        self.assertEqual(len(os.listdir(os.path.join(cache_dir, f"png-v{PNG_CACHE_VERSION}"))), 1)
+        self.assertEqual(PngOptimizer(cache_dir).optimize_file(os.path.join(self.src, "image.png")), optimized)
+
+    def test_sync_optimizes_once(self):
+        assets = {}
+        optimizer = PngOptimizer()
+        copied, _ = sync_directory(self.src, self.dst, assets, png_optimizer=optimizer)
+        self.assertEqual(copied, [os.path.join(self.dst, "image.png")])
+        with open(os.path.join(self.dst, "image.png"), "rb") as f:
+            self.assertEqual(decode_rows(f.read()), self.rows)
+        self.assertLess(assets["image.png"]["dest_size"], len(self.data))
+
+        copied, _ = sync_directory(self.src, self.dst, assets, png_optimizer=optimizer)
+        self.assertEqual(copied, [])
+
+    def test_turning_optimization_off_restores_original(self):
+        assets = {}
+        sync_directory(self.src, self.dst, assets, png_optimizer=PngOptimizer())
+        copied, _ = sync_directory(self.src, self.dst, assets)
+        self.assertEqual(copied, [os.path.join(self.dst, "image.png")])
+        with open(os.path.join(self.dst, "image.png"), "rb") as f:
+            self.assertEqual(f.read(), self.data)
+
+
+if __name__ == "__main__":
+    unittest.main()
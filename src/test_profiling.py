@@ -0,0 +1,94 @@
+import json
+import os
+import tempfile
+import unittest
+
+from block_cache import block_cache
+from generate_page import generate_pages_recursive
+from page import compile_page
+from profiling import NULL_PROFILER, Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def setUp(self):
+        self.profiler = Profiler()
+
+    def tearDown(self):
+        self.profiler.stop()
+
+    def test_stage_records_event(self):
+        with self.profiler.stage("parse", "a.md"):
+            data = [0] * 10000
+        self.assertEqual(len(self.profiler.events), 1)
+        event = self.profiler.events[0]
+        self.assertEqual(event["stage"], "parse")
+        self.assertEqual(event["page"], "a.md")
+        self.assertGreater(event["duration_ns"], 0)
+        self.assertGreaterEqual(event["alloc_bytes"], len(data) * 8)
+
+    def test_stage_records_event_on_error(self):
+        with self.assertRaises(ValueError):
+            with self.profiler.stage("parse", "bad.md"):
+                raise ValueError("boom")
+        self.assertEqual(self.profiler.events[0]["page"], "bad.md")
+
+    def test_slowest_pages_sums_stages(self):
+        self.profiler.events = [
+            {"stage": "read", "page": "a", "start_ns": 0, "duration_ns": 5, "alloc_bytes": 0, "pid": 1},
+            {"stage": "parse", "page": "a", "start_ns": 5, "duration_ns": 10, "alloc_bytes": 0, "pid": 1},
+            {"stage": "read", "page": "b", "start_ns": 0, "duration_ns": 12, "alloc_bytes": 0, "pid": 1},
+            {"stage": "static_copy", "page": None, "start_ns": 0, "duration_ns": 99, "alloc_bytes": 0, "pid": 1},
+        ]
+        self.assertEqual(self.profiler.slowest_pages(2), [("a", 15), ("b", 12)])
+        self.assertEqual(self.profiler.stage_totals()["read"], {"count": 2, "duration_ns": 17, "alloc_bytes": 0})
+        summary = self.profiler.summary(1)
+        self.assertIn("static_copy", summary)
+        self.assertIn("Slowest 1 pages:", summary)
+
+    def test_chrome_trace(self):
+        with self.profiler.stage("write", "a.md"):
+            pass
+        event = self.profiler.chrome_trace()["traceEvents"][0]
+        self.assertEqual(event["ph"], "X")
+        self.assertEqual(event["name"], "write")
+        self.assertEqual(event["args"]["page"], "a.md")
+
+    def test_null_profiler(self):
+        with NULL_PROFILER.stage("anything"):
+            pass
+        self.assertFalse(NULL_PROFILER.enabled)
+
+
+class TestProfiledBuild(unittest.TestCase):
+    def test_build_records_every_stage(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            os.makedirs(content)
+            template = os.path.join(root, "template.html")
+            with open(template, "w") as f:
+                f.write("{{ Title }}{{ Content }}")
+            with open(os.path.join(content, "index.md"), "w") as f:
+                f.write("# Home\n\nSome **text**")
+            profiler = Profiler(track_allocations=False)
+            generate_pages_recursive(content, template, os.path.join(root, "out"), "/", profiler=profiler)
+            stages = [event["stage"] for event in profiler.events]
+            # Blocks are rendered to HTML while compiling, then the page's
+            # HTML is joined from them before templating.
+            self.assertEqual(stages, ["read", "block_parse", "inline_parse", "render", "render", "template", "write"])
+            trace_path = os.path.join(root, "trace.json")
+            profiler.write_trace(trace_path)
+            with open(trace_path) as f:
+                self.assertEqual(len(json.load(f)["traceEvents"]), 7)
+
+    def test_compile_times_block_rendering_separately(self):
+        block_cache.clear()
+        profiler = Profiler(track_allocations=False)
+        page = compile_page(["# Profiled", "", "Some **profiled** text"], "a.md", profiler)
+        self.assertEqual([event["stage"] for event in profiler.events], ["block_parse", "inline_parse", "render"])
+        self.assertEqual(page.html, compile_page(["# Profiled", "", "Some **profiled** text"]).html)
+        self.assertEqual(block_cache.counters(), {"block_cache_hits": 2, "block_cache_misses": 2})
+        self.assertEqual(page.title, "Profiled")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import os
+import tempfile
+import unittest
+
+from generate_page import find_pages, generate_pages_recursive
+from scheduler import map_ordered, resolve_jobs
+
+
+def square(x):
+    if x < 0:
+        raise ValueError("negative")
+    return x * x
+
+
+class TestMapOrdered(unittest.TestCase):
+    def test_serial(self):
+        results = list(map_ordered(square, [1, 2, 3]))
+        self.assertEqual(results, [(1, None), (4, None), (9, None)])
+
+    def test_parallel_preserves_order(self):
+        results = list(map_ordered(square, range(50), jobs=4))
+        self.assertEqual([r for r, _ in results], [x * x for x in range(50)])
+
+    def test_errors_are_reported_per_item(self):
+        results = list(map_ordered(square, [2, -1, 3], jobs=2))
+        self.assertEqual(results[0], (4, None))
+        self.assertEqual(results[1], (None, "ValueError: negative"))
+        self.assertEqual(results[2], (9, None))
+
+    def test_resolve_jobs(self):
+        self.assertEqual(resolve_jobs(3), 3)
+        self.assertGreaterEqual(resolve_jobs(0), 1)
+
+
+class TestParallelBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template = os.path.join(self.tmp.name, "template.html")
+        os.makedirs(os.path.join(self.content, "b"))
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        for i in range(6):
+            with open(os.path.join(self.content, "b", f"p{i}.md"), "w") as f:
+                f.write(f"# Page {i}\n\nText with [a link](/p{i}).")
+        with open(os.path.join(self.content, "broken.md"), "w") as f:
+            f.write("no title here")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def build(self, dest, jobs):
+        return generate_pages_recursive(self.content, self.template, dest, "/base/", None, jobs)
+
+    def read_tree(self, root):
+        out = {}
+        for from_path, dest_path in find_pages(self.content, root):
+            if os.path.exists(dest_path):
+                with open(dest_path) as f:
+                    out[os.path.relpath(dest_path, root)] = f.read()
+        return out
+
+    def test_find_pages_is_sorted(self):
+        pages = find_pages(self.content, "out")
+        self.assertEqual(pages[0], (os.path.join(self.content, "b", "p0.md"), os.path.join("out", "b", "p0.html")))
+        self.assertEqual(pages[-1][0], os.path.join(self.content, "broken.md"))
+
+    def test_parallel_output_matches_serial(self):
+        serial = os.path.join(self.tmp.name, "serial")
+        parallel = os.path.join(self.tmp.name, "parallel")
+        serial_errors = self.build(serial, 1)
+        parallel_errors = self.build(parallel, 3)
+        self.assertEqual(serial_errors, parallel_errors)
+        self.assertEqual(self.read_tree(serial), self.read_tree(parallel))
+        self.assertIn('href="/base/p3"', self.read_tree(parallel)[os.path.join("b", "p3.html")])
+
+    def test_failed_page_is_reported(self):
+        errors = self.build(os.path.join(self.tmp.name, "out"), 2)
+        self.assertEqual(errors, [(os.path.join(self.content, "broken.md"), "ValueError: no title found")])
+
+
+if __name__ == "__main__":
+    unittest.main()
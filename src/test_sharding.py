@@ -0,0 +1,141 @@
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from manifest import BuildManifest
+from sharding import (
+    ShardConflict, load_shard_manifest, merge_shards, parse_shard, shard_manifest_path, shard_of, shard_pages,
+)
+
+MAIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+
+
+class TestShardFunctions(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ("4/4", "-1/4", "0/0", "1", "a/b"):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_partition_is_stable_and_complete(self):
+        paths = [f"blog/post{i}.md" for i in range(200)]
+        owners = [shard_of(path, 4) for path in paths]
+        self.assertEqual(owners, [shard_of(path, 4) for path in paths])
+        self.assertEqual(set(owners), {0, 1, 2, 3})
+        self.assertEqual(shard_of("blog/post7.md", 4), 1)
+
+    def test_shard_pages_uses_content_relative_paths(self):
+        pages = [(os.path.join("./content", f"p{i}.md"), f"docs/p{i}.html") for i in range(20)]
+        shards = [shard_pages(pages, "./content", (i, 3)) for i in range(3)]
+        self.assertEqual(sorted(sum(shards, [])), sorted(pages))
+        self.assertEqual(shards[0], shard_pages(pages, "content", (0, 3)))
+
+
+class TestShardedBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        with open(os.path.join(self.root, "template.html"), "w") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+        for i in range(9):
+            self.write(f"content/section{i % 3}/page{i}.md", f"# Page {i}\n\nBody {i}\n")
+            self.write(f"static/asset{i}.css", f"body {{ order: {i}; }}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, rel_path, text):
+        path = os.path.join(self.root, rel_path)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def run_main(self, *args):
+        return subprocess.run(
+            [sys.executable, MAIN, *args], cwd=self.root, capture_output=True, text=True,
+        )
+
+    def read_tree(self, root):
+        files = {}
+        for dirpath, _, filenames in os.walk(os.path.join(self.root, root)):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path) as f:
+                    files[os.path.relpath(path, self.root)] = f.read()
+        return files
+
+    def test_shards_in_parallel_then_merge_matches_full_build(self):
+        self.assertEqual(self.run_main("/base/").returncode, 0)
+        expected = self.read_tree("docs")
+        full_manifest = BuildManifest.load(os.path.join(self.root, ".build-manifest.json"))
+        shutil.rmtree(os.path.join(self.root, "docs"))
+        os.remove(os.path.join(self.root, ".build-manifest.json"))
+
+        processes = [
+            subprocess.Popen(
+                [sys.executable, MAIN, "/base/", "--shard", f"{i}/3"], cwd=self.root, stdout=subprocess.DEVNULL,
+            )
+            for i in range(3)
+        ]
+        self.assertEqual([process.wait() for process in processes], [0, 0, 0])
+        merged = self.run_main("merge")
+        self.assertEqual(merged.returncode, 0, merged.stdout)
+        self.assertIn("Merged 3 shard(s): 9 pages, 9 static files", merged.stdout)
+        self.assertEqual(self.read_tree("docs"), expected)
+        manifest = BuildManifest.load(os.path.join(self.root, ".build-manifest.json"))
+        self.assertEqual(manifest.pages, full_manifest.pages)
+        self.assertEqual(sorted(manifest.assets), sorted(full_manifest.assets))
+        self.assertFalse([name for name in os.listdir(self.root) if ".shard-" in name])
+
+        rebuild = self.run_main("/base/")
+        self.assertIn("Pages: 0 written, 0 identical (not rewritten), 9 up to date", rebuild.stdout)
+
+    def test_shard_starts_from_full_manifest(self):
+        self.run_main("/base/")
+        # Manifest keys are relative to the directory the build ran in.
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.root)
+        manifest = load_shard_manifest(".build-manifest.json", (1, 3), "./content")
+        self.assertEqual(manifest.path, shard_manifest_path(".build-manifest.json", (1, 3)))
+        self.assertEqual(manifest.shard, (1, 3))
+        self.assertTrue(0 < len(manifest.pages) < 9)
+        result = self.run_main("/base/", "--shard", "1/3")
+        self.assertIn(f"0 written, 0 identical (not rewritten), {len(manifest.pages)} up to date", result.stdout)
+
+    def test_merge_reports_missing_and_duplicate_shards(self):
+        for i in range(2):
+            self.run_main("/base/", "--shard", f"{i}/3")
+        paths = [os.path.join(self.root, f".build-manifest.shard-{i}-of-3.json") for i in range(2)]
+        with self.assertRaisesRegex(ShardConflict, "missing shards 2/3"):
+            merge_shards(paths, os.path.join(self.root, "merged.json"))
+        with self.assertRaisesRegex(ShardConflict, "are both shard 0/3"):
+            merge_shards([paths[0], paths[0]], os.path.join(self.root, "merged.json"))
+        self.assertTrue(all(os.path.exists(path) for path in paths))
+
+    def test_merge_reports_conflicting_and_changed_outputs(self):
+        for i in range(2):
+            self.run_main("/base/", "--shard", f"{i}/2")
+        paths = [os.path.join(self.root, f".build-manifest.shard-{i}-of-2.json") for i in range(2)]
+        first, second = (BuildManifest.load(path) for path in paths)
+        from_path, entry = next(iter(first.pages.items()))
+        second.pages[from_path] = entry
+        second.save()
+        with open(os.path.join(self.root, entry["dest"]), "a") as f:
+            f.write("changed")
+        result = self.run_main("merge")
+        self.assertEqual(result.returncode, 1)
+        self.assertIn(f"page {from_path} was built by both", result.stdout)
+        self.assertIn("is missing or does not match its manifest", result.stdout)
+        self.assertFalse(os.path.exists(os.path.join(self.root, ".build-manifest.json")))
+
+    def test_shard_rejects_precompress(self):
+        result = self.run_main("/base/", "--shard", "0/2", "--precompress")
+        self.assertEqual(result.returncode, 2)
+        self.assertIn("pass it to 'main.py merge'", result.stderr)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+
+from site_builder import DirectorySink, MemorySink, Site, build
+
+TEMPLATE = '<title>{{ Title }}</title><a href="/">home</a>{{ Content }}'
+
+
+class TestSiteBuilder(unittest.TestCase):
+    def test_build_in_memory(self):
+        sink, errors = build(
+            {"index.md": "# Home\n\nHello [blog](/blog)", "blog/post/index.md": "# Post\r\n\r\n**bold**"},
+            TEMPLATE, "/base/",
+        )
+        self.assertEqual(errors, [])
+        self.assertEqual(
+            sink.outputs,
+            {
+                "index.html": '<title>Home</title><a href="/base/">home</a>'
+                '<div><h1>Home</h1><p>Hello <a href="/base/blog">blog</a></p></div>',
+                "blog/post/index.html": '<title>Post</title><a href="/base/">home</a>'
+                "<div><h1>Post</h1><p><b>bold</b></p></div>",
+            },
+        )
+
+    def test_errors_do_not_stop_the_build(self):
+        sink, errors = build({"a.md": "no title", "b.md": "# B"}, TEMPLATE)
+        self.assertEqual(errors, [("a.md", "ValueError: no title found")])
+        self.assertEqual(list(sink.outputs), ["b.html"])
+
+    def test_partials_and_overrides(self):
+        site = Site(
+            {"index.md": "# Home", "blog/post.md": "# Post"},
+            "{{> header }}{{ Content }}",
+            partials={"header": "<h0>{{ Title }}</h0>"},
+            template_overrides=[("blog/*", "<article>{{ Content }}</article>")],
+        )
+        self.assertEqual(site.render("index.md"), "<h0>Home</h0><div><h1>Home</h1></div>")
+        self.assertEqual(site.render("blog/post.md"), "<article><div><h1>Post</h1></div></article>")
+
+    def test_custom_sink(self):
+        class ListSink:
+            def __init__(self):
+                self.pages = []
+
+            def write(self, path, html):
+                self.pages.append(path)
+
+        sink, _ = build({"b.md": "# B", "a.md": "# A"}, TEMPLATE, sink=ListSink())
+        self.assertEqual(sink.pages, ["a.html", "b.html"])
+
+    def test_directory_sink(self):
+        with tempfile.TemporaryDirectory() as root:
+            build({"blog/post/index.md": "# Post"}, TEMPLATE, sink=DirectorySink(root))
+            with open(os.path.join(root, "blog", "post", "index.html")) as f:
+                self.assertIn("<h1>Post</h1>", f.read())
+
+    def test_memory_sink_repr(self):
+        self.assertEqual(repr(MemorySink()), "MemorySink(0 outputs)")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import unittest
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Cumulative `python -X importtime` figure for `import main`, in
+# microseconds. It is about 50ms on a slow CI runner; the headroom absorbs
+# noise, not new dependencies.
+IMPORT_TIME_BUDGET_US = 150_000
+
+# Modules that only specific commands or options need. Importing any of
+# them at startup costs every build, watch rebuild and CI shard.
+LAZY_MODULES = (
+    "asyncio",
+    "click",
+    "concurrent.futures",
+    "gzip",
+    "http.server",
+    "multiprocessing",
+    "shutil",
+    "tempfile",
+    "tracemalloc",
+    "zlib",
+)
+
+
+def run_python(*args):
+    return subprocess.run(
+        [sys.executable, *args], cwd=SRC_DIR, capture_output=True, text=True, check=True,
+    )
+
+
+def import_time_us(module):
+    result = run_python("-X", "importtime", "-c", f"import {module}")
+    for line in result.stderr.splitlines():
+        fields = [field.strip() for field in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise AssertionError(f"{module} not found in -X importtime output")
+
+
+class TestStartup(unittest.TestCase):
+    def test_import_time_budget(self):
+        # Take the best of a few runs so one slow run does not fail the test.
+        best = min(import_time_us("main") for _ in range(3))
+        self.assertLess(
+            best, IMPORT_TIME_BUDGET_US,
+            f"importing main took {best / 1000:.1f}ms, over the {IMPORT_TIME_BUDGET_US / 1000:.0f}ms budget",
+        )
+
+    def test_heavy_modules_are_lazy(self):
+        result = run_python("-c", "import sys, main; print('\\n'.join(sys.modules))")
+        loaded = set(result.stdout.split())
+        self.assertEqual(sorted(loaded.intersection(LAZY_MODULES)), [])
+
+    def test_help_runs(self):
+        result = run_python("main.py", "--help")
+        self.assertIn("--jobs", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+
+from template import Template, TemplateLoader, load_template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render_fills_slots(self):
+        template = Template.from_string("<title>{{ Title }}</title><article>{{ Content }}</article>")
+        self.assertEqual(
+            template.render(Title="Hi", Content="<p>x</p>"),
+            "<title>Hi</title><article><p>x</p></article>",
+        )
+
+    def test_compiled_pieces(self):
+        template = Template.from_string("a{{ Title }}b{{ Content }}c")
+        self.assertEqual(template.pieces, ["a", "{{ Title }}", "b", "{{ Content }}", "c"])
+        self.assertEqual(template.slots, [(1, "Title"), (3, "Content")])
+
+    def test_iter_render_streams_iterable_values(self):
+        template = Template.from_string("<title>{{ Title }}</title>{{ Content }}<end>")
+        chunks = list(template.iter_render(Title="T", Content=iter(["<p>", "x", "</p>"])))
+        self.assertEqual(chunks, ["<title>", "T", "</title>", "<p>", "x", "</p>", "<end>"])
+
+    def test_missing_value_keeps_placeholder(self):
+        template = Template.from_string("<p>{{ Title }}</p>")
+        self.assertEqual(template.render(), "<p>{{ Title }}</p>")
+
+    def test_values_are_not_rescanned(self):
+        template = Template.from_string("{{ Title }}|{{ Content }}")
+        self.assertEqual(template.render(Title="{{ Content }}", Content="c"), "{{ Content }}|c")
+
+    def test_basepath_applies_to_literals_only(self):
+        template = Template.from_string('<link href="/index.css"><img src="/a.png">{{ Content }}', resolver="/site/")
+        self.assertEqual(
+            template.render(Content='<a href="/x">'),
+            '<link href="/site/index.css"><img src="/site/a.png"><a href="/x">',
+        )
+
+    def test_partials(self):
+        template = Template.from_string(
+            "{{> head }}<body>{{ Content }}</body>",
+            partials={"head": "<head><title>{{ Title }}</title></head>"},
+        )
+        self.assertEqual(template.render(Title="T", Content="C"), "<head><title>T</title></head><body>C</body>")
+
+    def test_layout(self):
+        template = Template.from_string(
+            "{{< base }}\n<article>{{ Content }}</article>",
+            partials={"base": "<html><title>{{ Title }}</title>{{ Content }}</html>"},
+        )
+        self.assertEqual(template.render(Title="T", Content="C"), "<html><title>T</title><article>C</article></html>")
+
+    def test_layout_must_come_first(self):
+        with self.assertRaises(ValueError):
+            Template.from_string("x{{< base }}", partials={"base": "{{ Content }}"})
+
+    def test_partial_cycle(self):
+        with self.assertRaises(ValueError):
+            Template.from_string("{{> a }}", partials={"a": "{{> b }}", "b": "{{> a }}"})
+
+
+class TestTemplateFiles(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = self.tmp.name
+        self.write("base.html", "<html>{{> nav.html }}{{ Content }}</html>")
+        self.write("nav.html", '<a href="/">home</a>')
+        self.write("post.html", "{{< base.html }}<article>{{ Content }}</article>")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, name, text):
+        with open(os.path.join(self.dir, name), "w") as f:
+            f.write(text)
+
+    def test_from_file_resolves_relative_includes(self):
+        template = Template.from_file(os.path.join(self.dir, "post.html"), resolver="/b/")
+        self.assertEqual(template.render(Content="x"), '<html><a href="/b/">home</a><article>x</article></html>')
+        self.assertEqual(len(template.dependencies), 3)
+
+    def test_load_template_is_cached_until_a_dependency_changes(self):
+        path = os.path.join(self.dir, "post.html")
+        first = load_template(path)
+        self.assertIs(load_template(path), first)
+        nav = os.path.join(self.dir, "nav.html")
+        self.write("nav.html", "<nav></nav>")
+        os.utime(nav, ns=(0, 0))
+        second = load_template(path)
+        self.assertIsNot(second, first)
+        self.assertNotEqual(second.digest, first.digest)
+
+    def test_loader_selects_template_per_page(self):
+        loader = TemplateLoader(os.path.join(self.dir, "base.html"), [("blog/*", os.path.join(self.dir, "post.html"))])
+        self.assertEqual(loader.path_for(os.path.join("blog", "tom", "index.md")), os.path.join(self.dir, "post.html"))
+        self.assertEqual(loader.path_for("index.md"), os.path.join(self.dir, "base.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
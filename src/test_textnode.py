@@ -1,6 +1,7 @@
 import unittest
 
 from textnode import TextNode, TextType
+from urls import BasepathResolver
 
 
 class TestTextNode(unittest.TestCase):
@@ -61,6 +62,10 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode(text, TextType.NORMAL)
         self.assertEqual(node, node2)
 
+    def test_no_instance_dict(self):
+        node = TextNode("text", TextType.NORMAL)
+        self.assertFalse(hasattr(node, "__dict__"))
+
     def test_repr(self):
         node = TextNode("This is a text node", TextType.BOLD, "https://example.com")
         expected = "TextNode(This is a text node, BOLD, https://example.com)"
@@ -101,6 +106,15 @@ class TestTextNode(unittest.TestCase):
         self.assertEqual(html_node.value, "Alt text")
         self.assertEqual(html_node.props, {"src": "https://example.com/image.png"})
 
+    def test_text_node_to_html_node_resolves_urls(self):
+        resolver = BasepathResolver("/base/")
+        link = TextNode.text_node_to_html_node(TextNode("Home", TextType.LINK, "/"), resolver)
+        image = TextNode.text_node_to_html_node(TextNode("Alt", TextType.IMAGE, "/a.png"), resolver)
+        text = TextNode.text_node_to_html_node(TextNode('href="/x"', TextType.CODE), resolver)
+        self.assertEqual(link.props, {"href": "/base/"})
+        self.assertEqual(image.props, {"src": "/base/a.png"})
+        self.assertEqual(text.value, 'href="/x"')
+
     def test_text_node_to_html_node_invalid_type(self):
         # Create a TextNode with an invalid type (this is a bit hacky for testing)
         invalid_type = "INVALID"
@@ -0,0 +1,95 @@
+import json
+import os
+import tempfile
+import unittest
+
+from template import Template
+from urls import BasepathResolver, RelativeResolver, UrlResolver, as_resolver, load_asset_map
+
+
+class TestBasepathResolver(unittest.TestCase):
+    def test_prefixes_root_relative_urls_only(self):
+        resolver = BasepathResolver("/base/")
+        self.assertEqual(resolver.resolve("/"), "/base/")
+        self.assertEqual(resolver.resolve("/blog/tom?x=1#top"), "/base/blog/tom?x=1#top")
+        self.assertEqual(resolver.resolve("https://example.com/"), "https://example.com/")
+        self.assertEqual(resolver.resolve("//cdn.example.com/a.js"), "//cdn.example.com/a.js")
+        self.assertEqual(resolver.resolve("images/a.png"), "images/a.png")
+        self.assertEqual(resolver.resolve("#section"), "#section")
+
+    def test_asset_map_applies_before_basepath(self):
+        resolver = BasepathResolver("/base/", {"/index.css": "/index.3f2a.css"})
+        self.assertEqual(resolver.resolve("/index.css"), "/base/index.3f2a.css")
+        self.assertEqual(resolver.resolve("/other.css"), "/base/other.css")
+
+    def test_key_reflects_configuration(self):
+        keys = {
+            BasepathResolver("/").key,
+            BasepathResolver("/base/").key,
+            BasepathResolver("/", {"/a": "/b"}).key,
+            BasepathResolver("/", {"/a": "/c"}).key,
+        }
+        self.assertEqual(len(keys), 4)
+        self.assertEqual(BasepathResolver("/", {"/a": "/b"}).key, BasepathResolver("/", {"/a": "/b"}).key)
+
+
+class TestRelativeResolver(unittest.TestCase):
+    def test_relative_to_page_directory(self):
+        resolver = RelativeResolver().for_page("blog/tom/index.md")
+        self.assertEqual(resolver.resolve("/index.css"), "../../index.css")
+        self.assertEqual(resolver.resolve("/"), "../../")
+        self.assertEqual(resolver.resolve("/blog/tom/"), "./")
+        self.assertEqual(resolver.resolve("/blog/majesty#end"), "../majesty#end")
+        self.assertEqual(resolver.resolve("https://example.com/"), "https://example.com/")
+
+    def test_root_page(self):
+        resolver = RelativeResolver({"/index.css": "/index.3f2a.css"}).for_page("index.md")
+        self.assertEqual(resolver.resolve("/index.css"), "index.3f2a.css")
+        self.assertEqual(resolver.resolve("/blog/"), "blog/")
+
+    def test_key_is_per_directory(self):
+        resolver = RelativeResolver()
+        self.assertEqual(resolver.for_page("blog/a.md").key, resolver.for_page("blog/b.md").key)
+        self.assertNotEqual(resolver.for_page("blog/a.md").key, resolver.for_page("a.md").key)
+
+
+class TestTemplateUrls(unittest.TestCase):
+    def test_only_url_attributes_are_resolved(self):
+        template = Template.from_string(
+            '<a href="/x">/x</a><img data-src="/y" src="/z"><p>href="/literal</p>{{ Content }}',
+            BasepathResolver("/b/"),
+        )
+        self.assertEqual(
+            template.render(Content=""),
+            '<a href="/b/x">/x</a><img data-src="/b/y" src="/b/z"><p>href="/literal</p>',
+        )
+
+    def test_digest_depends_on_resolver(self):
+        text = '<a href="/">{{ Content }}</a>'
+        self.assertNotEqual(
+            Template.from_string(text, BasepathResolver("/a/")).digest,
+            Template.from_string(text, BasepathResolver("/a/", {"/x": "/y"})).digest,
+        )
+
+    def test_as_resolver(self):
+        self.assertIsNone(as_resolver(None))
+        self.assertEqual(as_resolver("/b/").key, BasepathResolver("/b/").key)
+        resolver = UrlResolver()
+        self.assertIs(as_resolver(resolver), resolver)
+
+
+class TestLoadAssetMap(unittest.TestCase):
+    def test_load(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "assets.json")
+            with open(path, "w") as f:
+                json.dump({"/a.css": "/a.1.css"}, f)
+            self.assertEqual(load_asset_map(path), {"/a.css": "/a.1.css"})
+            with open(path, "w") as f:
+                json.dump(["/a.css"], f)
+            with self.assertRaises(ValueError):
+                load_asset_map(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+import os
+import tempfile
+import unittest
+
+import main
+from manifest import BuildManifest
+from watch import ChangeSet, Watcher, classify_changes, diff_snapshots
+
+
+class TestDiffSnapshots(unittest.TestCase):
+    def test_created_modified_deleted(self):
+        old = {"a": (1, 1), "b": (1, 1), "c": (1, 1)}
+        new = {"a": (1, 1), "b": (2, 1), "d": (1, 1)}
+        self.assertEqual(diff_snapshots(old, new), {"b": "modified", "c": "deleted", "d": "created"})
+
+    def test_no_changes(self):
+        self.assertEqual(diff_snapshots({"a": (1, 1)}, {"a": (1, 1)}), {})
+
+
+class TestWatcher(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        os.makedirs(os.path.join(self.root, "content", "blog"))
+        self.page = os.path.join(self.root, "content", "blog", "post.md")
+        self.write(self.page, "# Post")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, path, text):
+        with open(path, "w") as f:
+            f.write(text)
+
+    def test_poll_reports_changes_once(self):
+        watcher = Watcher([os.path.join(self.root, "content")])
+        self.write(self.page, "# Post, edited")
+        os.utime(self.page, ns=(1, 1))
+        self.assertEqual(watcher.poll(), {self.page: "modified"})
+        self.assertEqual(watcher.poll(), {})
+
+    def test_wait_for_changes_debounces(self):
+        watcher = Watcher([os.path.join(self.root, "content")], interval=0.001, debounce=0.001)
+        new_page = os.path.join(self.root, "content", "new.md")
+        self.write(new_page, "# New")
+        os.remove(self.page)
+        self.assertEqual(watcher.wait_for_changes(), {new_page: "created", self.page: "deleted"})
+
+    def test_missing_file_is_ignored(self):
+        watcher = Watcher([os.path.join(self.root, "template.html")])
+        self.assertEqual(watcher.state, {})
+
+
+class TestClassifyChanges(unittest.TestCase):
+    def test_classify(self):
+        changes = {
+            "content/blog/post.md": "modified",
+            "content/old.md": "deleted",
+            "static/images/a.png": "created",
+            "static/gone.css": "deleted",
+            "template.html": "modified",
+            "elsewhere.txt": "modified",
+        }
+        changeset = classify_changes(changes, "content", "static", ["template.html"])
+        self.assertTrue(changeset.template_changed)
+        self.assertEqual(changeset.pages, [os.path.join("blog", "post.md")])
+        self.assertEqual(changeset.deleted_pages, ["old.md"])
+        self.assertEqual(changeset.assets, [os.path.join("images", "a.png")])
+        self.assertEqual(changeset.deleted_assets, ["gone.css"])
+
+    def test_content_prefix_is_not_a_match(self):
+        changeset = classify_changes({"content-old/a.md": "modified"}, "content", "static", [])
+        self.assertEqual(changeset.pages, [])
+
+
+
+class TestRebuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        # main's paths are relative to the site root.
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(self.tmp.name)
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("content/index.md", "# Home")
+        self.write("content/blog/post.md", "# Post")
+        self.write("static/a.css", "a {}")
+        self.write("static/b.css", "b {}")
+        self.args = main.parse_args(["watch", "/base/"])
+        self.manifest = BuildManifest.load(main.manifest_path)
+        main.build(self.args, self.manifest)
+        # Zeroed mtimes show which outputs a rebuild rewrites, even on
+        # filesystems with coarse timestamps.
+        for path in self.outputs():
+            os.utime(path, ns=(0, 0))
+
+    def write(self, path, text):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+
+    def read(self, path):
+        with open(path) as f:
+            return f.read()
+
+    def outputs(self):
+        for dirpath, _, filenames in os.walk("docs"):
+            for filename in filenames:
+                yield os.path.join(dirpath, filename)
+
+    def changed_outputs(self):
+        return sorted(path for path in self.outputs() if os.stat(path).st_mtime_ns != 0)
+
+    def changeset(self, **changes):
+        changeset = ChangeSet()
+        for name, value in changes.items():
+            setattr(changeset, name, value)
+        return changeset
+
+    def rebuild(self, **changes):
+        return main.rebuild(self.args, self.manifest, self.changeset(**changes))
+
+    def test_page_edit_rebuilds_one_page(self):
+        self.write("content/blog/post.md", "# Edited")
+        self.assertEqual(self.rebuild(pages=[os.path.join("blog", "post.md")]), [])
+        self.assertEqual(self.changed_outputs(), [os.path.join("docs", "blog", "post.html")])
+        self.assertIn("<title>Edited</title>", self.read("docs/blog/post.html"))
+
+    def test_template_change_rebuilds_every_page(self):
+        self.write("template.html", "<h0>{{ Title }}</h0>{{ Content }}")
+        self.rebuild(template_changed=True)
+        self.assertEqual(
+            self.changed_outputs(), [os.path.join("docs", "blog", "post.html"), os.path.join("docs", "index.html")]
+        )
+        self.assertTrue(self.read("docs/index.html").startswith("<h0>Home</h0>"))
+
+    def test_static_change_syncs_one_file(self):
+        self.write("static/a.css", "a { color: red; }")
+        self.rebuild(assets=["a.css"])
+        self.assertEqual(self.changed_outputs(), [os.path.join("docs", "a.css")])
+        self.assertEqual(self.read("docs/a.css"), "a { color: red; }")
+
+    def test_deletions_remove_outputs(self):
+        os.remove("content/blog/post.md")
+        os.remove("static/b.css")
+        self.rebuild(deleted_pages=[os.path.join("blog", "post.md")], deleted_assets=["b.css"])
+        self.assertFalse(os.path.exists("docs/blog/post.html"))
+        self.assertFalse(os.path.exists("docs/b.css"))
+        self.assertEqual(self.changed_outputs(), [])
+        saved = BuildManifest.load(main.manifest_path)
+        self.assertNotIn(os.path.join(main.content_dir_path, "blog", "post.md"), saved.pages)
+        self.assertNotIn("b.css", saved.assets)
+
+    def test_broken_template_does_not_stop_watching(self):
+        self.write("template.html", "{{> missing.html }}")
+        self.assertFalse(main.try_rebuild(self.args, self.manifest, self.changeset(template_changed=True)))
+        self.write("template.html", "<p>{{ Title }}</p>{{ Content }}")
+        self.assertTrue(main.try_rebuild(self.args, self.manifest, self.changeset(template_changed=True)))
+        self.assertTrue(self.read("docs/index.html").startswith("<p>Home</p>"))
+
+
+if __name__ == "__main__":
+    unittest.main()
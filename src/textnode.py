@@ -4,6 +4,8 @@ from htmlnode import LeafNode
 TextType = Enum("TextType", ["NORMAL", "BOLD", "ITALIC", "LINK", "IMAGE", "CODE"])
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: str = None):
         self.text = text
         self.text_type = text_type
@@ -15,7 +17,7 @@ class TextNode:
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type.name}, {self.url})"
     
-    def text_node_to_html_node(text_node):
+    def text_node_to_html_node(text_node, resolver=None):
         match text_node.text_type:
             case TextType.NORMAL:
                 return LeafNode(None, text_node.text)
@@ -24,9 +26,11 @@ class TextNode:
             case TextType.ITALIC:
                 return LeafNode("i", text_node.text)
             case TextType.LINK:
-                return LeafNode("a", text_node.text, {"href": text_node.url})
+                url = text_node.url if resolver is None else resolver.resolve(text_node.url)
+                return LeafNode("a", text_node.text, {"href": url})
             case TextType.IMAGE:
-                return LeafNode("img", text_node.text, {"src": text_node.url})
+                url = text_node.url if resolver is None else resolver.resolve(text_node.url)
+                return LeafNode("img", text_node.text, {"src": url})
             case TextType.CODE:
                 return LeafNode("code", text_node.text)
             case _:
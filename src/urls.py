@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+import posixpath
+
+
+class UrlResolver:
+    # Maps each URL written in a markdown link or image, or in a template's
+    # href/src attribute, to the URL written to the output. key must change
+    # whenever resolve() would, because rendered blocks, parse cache entries
+    # and compiled templates are cached under it.
+    key = "identity"
+
+    def resolve(self, url):
+        return url
+
+    def for_page(self, rel_path):
+        # The resolver for the page built from rel_path, a "/"-separated
+        # path relative to the content directory.
+        return self
+
+
+class BasepathResolver(UrlResolver):
+    # Maps fingerprinted assets, then prefixes root-relative URLs with
+    # basepath.
+    def __init__(self, basepath="/", assets=None):
+        self.basepath = basepath
+        self.assets = assets if assets is not None else {}
+        self.key = f"basepath:{basepath}{assets_key(self.assets)}"
+
+    def __repr__(self):
+        return f"BasepathResolver({self.basepath!r}, {len(self.assets)} assets)"
+
+    def resolve(self, url):
+        url = self.assets.get(url, url)
+        if is_root_relative(url):
+            return self.basepath + url[1:]
+        return url
+
+
+class RelativeResolver(UrlResolver):
+    # Maps fingerprinted assets, then rewrites root-relative URLs relative
+    # to the page's directory, so the output works from any location.
+    def __init__(self, assets=None, page_dir="", _assets_key=None):
+        self.assets = assets if assets is not None else {}
+        self.page_dir = page_dir
+        self._assets_key = assets_key(self.assets) if _assets_key is None else _assets_key
+        self.key = f"relative:{page_dir}{self._assets_key}"
+
+    def __repr__(self):
+        return f"RelativeResolver({self.page_dir!r}, {len(self.assets)} assets)"
+
+    def for_page(self, rel_path):
+        page_dir = posixpath.dirname(rel_path.replace(os.sep, "/"))
+        return RelativeResolver(self.assets, page_dir, self._assets_key)
+
+    def resolve(self, url):
+        url = self.assets.get(url, url)
+        if not is_root_relative(url):
+            return url
+        end = len(url)
+        for marker in "?#":
+            index = url.find(marker)
+            if index != -1:
+                end = min(end, index)
+        path, suffix = url[:end], url[end:]
+        relative = posixpath.relpath(path, "/" + self.page_dir)
+        if path.endswith("/"):
+            relative = "./" if relative == "." else relative + "/"
+        return relative + suffix
+
+
+def is_root_relative(url):
+    return url.startswith("/") and not url.startswith("//")
+
+
+def assets_key(assets):
+    if not assets:
+        return ""
+    data = json.dumps(assets, sort_keys=True).encode()
+    return ":" + hashlib.sha256(data).hexdigest()[:16]
+
+
+def as_resolver(value):
+    # Accepts a resolver, a basepath string or None (URLs left as written).
+    if value is None or isinstance(value, UrlResolver):
+        return value
+    return BasepathResolver(value)
+
+
+def load_asset_map(path):
+    # A JSON object mapping asset URLs to fingerprinted ones, such as
+    # {"/index.css": "/index.3f2a9c.css"}.
+    with open(path, "r") as f:
+        assets = json.load(f)
+    if not isinstance(assets, dict) or not all(
+        isinstance(k, str) and isinstance(v, str) for k, v in assets.items()
+    ):
+        raise ValueError(f"{path} must contain a JSON object mapping URLs to URLs")
+    return assets
@@ -0,0 +1,118 @@
+import os
+import time
+
+
+def snapshot(paths):
+    state = {}
+    for path in paths:
+        if os.path.isdir(path):
+            _scan(path, state)
+        else:
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            state[path] = (st.st_mtime_ns, st.st_size)
+    return state
+
+
+def _scan(directory, state):
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                _scan(entry.path, state)
+            elif entry.is_file():
+                st = entry.stat()
+                state[entry.path] = (st.st_mtime_ns, st.st_size)
+
+
+def diff_snapshots(old, new):
+    changes = {}
+    for path, stamp in new.items():
+        previous = old.get(path)
+        if previous is None:
+            changes[path] = "created"
+        elif previous != stamp:
+            changes[path] = "modified"
+    for path in old.keys() - new.keys():
+        changes[path] = "deleted"
+    return changes
+
+
+class Watcher:
+    def __init__(self, paths, interval=0.05, debounce=0.02):
+        self.paths = list(paths)
+        self.interval = interval
+        self.debounce = debounce
+        self.state = snapshot(self.paths)
+
+    def __repr__(self):
+        return f"Watcher({self.paths}, {len(self.state)} files)"
+
+    def poll(self):
+        new_state = snapshot(self.paths)
+        changes = diff_snapshots(self.state, new_state)
+        self.state = new_state
+        return changes
+
+    def wait_for_changes(self):
+        changes = {}
+        while not changes:
+            time.sleep(self.interval)
+            changes = self.poll()
+        # Keep collecting until the burst settles so an editor's
+        # write-rename-chmod sequence triggers one rebuild.
+        while True:
+            time.sleep(self.debounce)
+            more = self.poll()
+            if not more:
+                return changes
+            for path, kind in more.items():
+                changes[path] = _merge(changes.get(path), kind)
+
+
+def _merge(previous, kind):
+    if previous == "created" and kind == "modified":
+        return "created"
+    if previous == "created" and kind == "deleted":
+        return "deleted"
+    if previous == "deleted" and kind == "created":
+        return "modified"
+    return kind
+
+
+class ChangeSet:
+    def __init__(self):
+        self.template_changed = False
+        self.pages = []
+        self.deleted_pages = []
+        self.assets = []
+        self.deleted_assets = []
+
+    def __repr__(self):
+        return (
+            f"ChangeSet(template={self.template_changed}, pages={self.pages}, deleted_pages={self.deleted_pages}, "
+            f"assets={self.assets}, deleted_assets={self.deleted_assets})"
+        )
+
+
+def classify_changes(changes, content_dir, static_dir, template_paths):
+    content_dir = os.path.abspath(content_dir)
+    static_dir = os.path.abspath(static_dir)
+    template_paths = {os.path.abspath(p) for p in template_paths}
+    changeset = ChangeSet()
+    for path, kind in sorted(changes.items()):
+        abs_path = os.path.abspath(path)
+        if abs_path in template_paths:
+            changeset.template_changed = True
+        elif _is_within(abs_path, content_dir):
+            rel_path = os.path.relpath(abs_path, content_dir)
+            (changeset.deleted_pages if kind == "deleted" else changeset.pages).append(rel_path)
+        elif _is_within(abs_path, static_dir):
+            rel_path = os.path.relpath(abs_path, static_dir)
+            (changeset.deleted_assets if kind == "deleted" else changeset.assets).append(rel_path)
+    return changeset
+
+
+def _is_within(path, directory):
+    return path.startswith(directory + os.sep)